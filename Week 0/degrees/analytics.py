@@ -0,0 +1,154 @@
+import csv
+import os
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import degrees
+
+# Number of sources summarized by stats when no names are given
+DEFAULT_SOURCES = 10
+
+USAGE = ("Usage: python analytics.py bacon [--snapshot] directory name\n"
+         "       python analytics.py stats [--snapshot] directory [name ...]")
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if arg != "--snapshot"]
+    snapshot = len(args) != len(sys.argv) - 1
+    if len(args) < 2 or args[0] not in ["bacon", "stats"]:
+        sys.exit(USAGE)
+    mode, directory, names = args[0], args[1], args[2:]
+    if mode == "bacon" and len(names) != 1:
+        sys.exit(USAGE)
+
+    print("Loading data...", file=sys.stderr)
+    load(directory, snapshot)
+    print("Data loaded.", file=sys.stderr)
+
+    sources = []
+    for name in names:
+        source = degrees.person_id_for_name(name)
+        if source is None:
+            sys.exit(f"Person not found: {name}")
+        sources.append(source)
+
+    if mode == "bacon":
+        writer = csv.writer(sys.stdout)
+        writer.writerow(["person_id", "name", "degrees", "movie_id", "parent_id"])
+        table = single_source(sources[0])
+        for person_id, (distance, movie_id, parent_id) in sorted(
+            table.items(), key=lambda item: item[1][0]
+        ):
+            name = degrees.people[person_id]["name"]
+            writer.writerow([person_id, name, distance, movie_id, parent_id])
+        return
+
+    # Without names, summarize the best connected people
+    if not sources:
+        graph = degrees.graph
+        best = sorted(range(len(graph.person_ids)), key=graph.degree, reverse=True)
+        sources = [graph.person_ids[person] for person in best[:DEFAULT_SOURCES]]
+
+    print("Degree distribution (co-stars: people)")
+    for degree, count in sorted(degree_histogram(directory, snapshot).items()):
+        print(f"{degree}: {count}")
+
+    for summary in multi_source(sources, directory, snapshot):
+        name = degrees.people[summary["source"]]["name"]
+        print()
+        print(f"{name} ({summary['source']}): reaches {summary['reachable']} people, "
+              f"mean {summary['mean']:.2f}, max {summary['eccentricity']} degrees")
+        for distance, count in sorted(summary["histogram"].items()):
+            print(f"{distance}: {count}")
+
+
+def load(directory, snapshot=False):
+    """
+    Loads the data column-wise, unless it is already loaded (as in
+    pool workers forked from a process that loaded it).
+    """
+    if degrees.graph is not None:
+        return
+    degrees.load_data(directory, snapshot=snapshot, streaming=True)
+
+
+def single_source(source_id):
+    """
+    Returns a dict mapping every person reachable from source_id to
+    (degrees, movie_id, parent_id): their degrees of separation, and the
+    movie and person through which a shortest path reaches them.
+    The source maps to (0, None, None).
+    """
+    graph = degrees.graph
+    distance, parent, via = graph.breadth_first(graph.person_index[source_id])
+    table = {}
+    for person, person_id in enumerate(graph.person_ids):
+        if distance[person] == -1:
+            continue
+        if parent[person] == person:
+            table[person_id] = (0, None, None)
+        else:
+            table[person_id] = (distance[person],
+                                graph.movie_ids[via[person]],
+                                graph.person_ids[parent[person]])
+    return table
+
+
+def summarize_source(source_id):
+    """
+    Returns summary statistics of the distances from source_id.
+    """
+    graph = degrees.graph
+    distance, _, _ = graph.breadth_first(graph.person_index[source_id])
+    histogram = Counter(d for d in distance if d != -1)
+    reachable = sum(histogram.values())
+    return {
+        "source": source_id,
+        "reachable": reachable,
+        "eccentricity": max(histogram),
+        "mean": sum(d * count for d, count in histogram.items()) / reachable,
+        "histogram": histogram
+    }
+
+
+def count_degrees(start, stop):
+    """
+    Returns a Counter of the degrees of the people with indexes
+    start to stop - 1.
+    """
+    graph = degrees.graph
+    return Counter(graph.degree(person) for person in range(start, stop))
+
+
+def multi_source(sources, directory, snapshot=False, workers=None):
+    """
+    Returns summarize_source for every source, computed across a
+    pool of processes that each load the data from directory.
+    """
+    with ProcessPoolExecutor(max_workers=workers, initializer=load,
+                             initargs=(directory, snapshot)) as pool:
+        return list(pool.map(summarize_source, sources))
+
+
+def degree_histogram(directory, snapshot=False, workers=None):
+    """
+    Returns a Counter mapping each number of co-stars to the number
+    of people with that many, computed across a pool of processes.
+    """
+    workers = workers or os.cpu_count() or 1
+    n = len(degrees.graph.person_ids)
+    size = max(1, -(-n // workers))
+    starts = range(0, n, size)
+    stops = [min(start + size, n) for start in starts]
+
+    histogram = Counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=load,
+                             initargs=(directory, snapshot)) as pool:
+        for counts in pool.map(count_degrees, starts, stops):
+            histogram.update(counts)
+    return histogram
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,11 @@
 import csv
 import sys
 
-from util import Node, StackFrontier, QueueFrontier
+from graph import MovieGraph
+from ingest import NameIndex, Records, read_columns
+from landmarks import LandmarkIndex, landmarks_path
+from snapshot import read_snapshot, snapshot_key, snapshot_path, write_snapshot
+from util import Node, DequeQueueFrontier
 
 # Maps names to a set of corresponding person_ids
 names = {}
@@ -12,11 +16,47 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Compact form of the graph, once compile_graph has been called
+graph = None
 
-def load_data(directory):
+# Landmark distances over the compact graph, once load_landmarks has been called
+landmarks = None
+
+# Sorted name index, replacing names when the data is loaded column-wise
+name_index = None
+
+
+def load_data(directory, snapshot=False, streaming=False):
     """
     Load data from CSV files into memory.
+
+    If streaming is True, the CSV files are read column-wise straight
+    into the compact graph (see ingest.read_columns), with people and
+    movies kept as Records and names replaced by name_index.
+
+    If snapshot is True, memory-maps the binary snapshot of that
+    column-wise data instead when one matching the CSV files exists,
+    or streams the CSV files and writes one.
     """
+    if snapshot:
+        path = snapshot_path(directory)
+        key = snapshot_key(directory)
+        data = read_snapshot(path, key)
+        if data is not None:
+            use_columns(data)
+            return
+
+    if snapshot or streaming:
+        use_columns(read_columns(directory))
+        if snapshot:
+            # The snapshot is only a cache, so failing to write one
+            # (a read-only directory or a full disk) is not an error
+            try:
+                write_snapshot(path, key, people, movies, graph, name_index)
+            except OSError:
+                pass
+        return
+
     # Load people
     with open(f"{directory}/people.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
@@ -52,14 +92,87 @@ def load_data(directory):
                 pass
 
 
+def use_columns(data):
+    """
+    Makes column-wise data, as returned by read_columns or
+    read_snapshot, the loaded data.
+    """
+    global people, movies, graph, name_index
+    graph = data["graph"]
+
+    # The id indexes of a graph from a snapshot are only built if needed
+    loaded = graph
+    people = Records(graph.person_ids, lambda: loaded.person_index, {
+        "name": data["person_names"],
+        "birth": data["person_births"]
+    })
+    movies = Records(graph.movie_ids, lambda: loaded.movie_index, {
+        "title": data["movie_titles"],
+        "year": data["movie_years"]
+    })
+    name_index = NameIndex(data["person_names"], data.get("name_order"))
+
+
+def compile_graph():
+    """
+    Builds the compact MovieGraph from the loaded data and drops the
+    per-person and per-movie sets, which it replaces.
+    """
+    global graph
+    graph = MovieGraph.build(people, movies)
+    for person in people.values():
+        del person["movies"]
+    for movie in movies.values():
+        del movie["stars"]
+
+
+def load_landmarks(directory):
+    """
+    Loads the landmark index stored alongside the data, building and
+    saving it first if it is missing or stale. Compiles the data if
+    that has not been done yet.
+    """
+    global landmarks
+    if graph is None:
+        compile_graph()
+    path = landmarks_path(directory)
+    key = snapshot_key(directory)
+    landmarks = LandmarkIndex.load(path, key)
+    if landmarks is None:
+        landmarks = LandmarkIndex.build(graph)
+        landmarks.save(path, key)
+
+
+def separation_bounds(source, target):
+    """
+    Returns (lower, upper) bounds on the degrees of separation of
+    source and target from the landmark index, or None if they are
+    not connected. The upper bound is None when no landmark is
+    connected to them.
+    """
+    return landmarks.bounds(graph.person_index[source], graph.person_index[target])
+
+
+FLAGS = ["--bidirectional", "--compact", "--snapshot", "--landmarks", "--streaming"]
+
+
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    flags = [arg for arg in sys.argv[1:] if arg.startswith("--")]
+    if len(args) > 1 or any(flag not in FLAGS for flag in flags):
+        sys.exit("Usage: python degrees.py [--bidirectional] [--compact] [--snapshot] "
+                 "[--landmarks] [--streaming] [directory]")
+    directory = args[0] if len(args) == 1 else "large"
+    bidirectional = "--bidirectional" in flags
 
     # Load data from files into memory
     print("Loading data...")
-    load_data(directory)
+    load_data(directory, snapshot="--snapshot" in flags,
+              streaming="--streaming" in flags)
+    if "--compact" in flags and graph is None:
+        compile_graph()
+    if "--landmarks" in flags:
+        load_landmarks(directory)
     print("Data loaded.")
 
     source = person_id_for_name(input("Name: "))
@@ -69,7 +182,7 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    path = shortest_path(source, target, bidirectional=bidirectional)
 
     if path is None:
         print("Not connected.")
@@ -84,19 +197,29 @@ def main():
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
-def shortest_path(source, target):
+def shortest_path(source, target, bidirectional=False):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
     If no possible path, returns None.
+
+    If bidirectional is True, searches from both ends at once
+    (see bidirectional_shortest_path). Once compile_graph has been
+    called, the bidirectional search always runs on the compact graph,
+    pruned by the landmark index if one is loaded.
     """
+    if graph is not None:
+        return graph.shortest_path(source, target, landmarks=landmarks)
+    if bidirectional:
+        return bidirectional_shortest_path(source, target)
+
     #start_person = person_id_for_name(source)
     #goal = person_id_for_name(target)
     start = Node(state=source, parent=None, action=None)
-    frontier = QueueFrontier()
+    frontier = DequeQueueFrontier()
     frontier.add(start)
-    explored = []
+    explored = set()
 
     while True:
         #Checks if the frontier is empty, if so there is no solution
@@ -121,7 +244,7 @@ def shortest_path(source, target):
             return shortest_list
         
         #Puts the node.state(which is the actor) in the explored set.
-        explored.append(node.state)
+        explored.add(node.state)
         
 
         for action, state in neighbors_for_person(node.state):
@@ -130,12 +253,107 @@ def shortest_path(source, target):
                 child = Node(state=state, parent=node, action=action)
                 frontier.add(child)
 
+
+def bidirectional_shortest_path(source, target):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, searching breadth-first
+    from the source and from the target at the same time until the
+    two searches meet in the middle.
+
+    If no possible path, returns None.
+    """
+    if source == target:
+        return []
+
+    # Maps each reached person to (person_id, movie_id) of the step that
+    # reached them: towards the source for the forward search and
+    # towards the target for the backward search
+    forward_parents = {source: None}
+    backward_parents = {target: None}
+    forward_layer = [source]
+    backward_layer = [target]
+
+    while forward_layer and backward_layer:
+
+        # Always expand the smaller side, it touches fewer people
+        if len(forward_layer) <= len(backward_layer):
+            layer, parents, others = forward_layer, forward_parents, backward_parents
+        else:
+            layer, parents, others = backward_layer, backward_parents, forward_parents
+
+        # Expand the whole layer so the best meeting point can be chosen
+        next_layer = []
+        meeting = None
+        for person_id in layer:
+            for movie_id, neighbor_id in neighbors_for_person(person_id):
+                if neighbor_id in parents:
+                    continue
+                parents[neighbor_id] = (person_id, movie_id)
+                next_layer.append(neighbor_id)
+                if neighbor_id in others and meeting is None:
+                    meeting = neighbor_id
+
+        if meeting is not None:
+            return join_paths(meeting, forward_parents, backward_parents)
+
+        if parents is forward_parents:
+            forward_layer = next_layer
+        else:
+            backward_layer = next_layer
+
+    return None
+
+
+def join_paths(meeting, forward_parents, backward_parents):
+    """
+    Builds the list of (movie_id, person_id) pairs running from the
+    source through the meeting person to the target.
+    """
+    path = []
+
+    # Walk back from the meeting person to the source
+    person_id = meeting
+    while forward_parents[person_id] is not None:
+        parent_id, movie_id = forward_parents[person_id]
+        path.append((movie_id, person_id))
+        person_id = parent_id
+    path.reverse()
+
+    # Walk forward from the meeting person to the target
+    person_id = meeting
+    while backward_parents[person_id] is not None:
+        next_id, movie_id = backward_parents[person_id]
+        path.append((movie_id, next_id))
+        person_id = next_id
+
+    return path
+
+
+def person_ids_for_name(name):
+    """
+    Returns the set of IMDB ids of people with a name, ignoring case.
+    """
+    if name_index is not None:
+        return {graph.person_ids[person] for person in name_index.lookup(name)}
+    return names.get(name.lower(), set())
+
+
+def person_ids_for_prefix(prefix, limit=None):
+    """
+    Returns the IMDB ids of people whose name starts with prefix,
+    ignoring case, in name order and at most limit of them.
+    Needs the data to be loaded column-wise (see load_data).
+    """
+    return [graph.person_ids[person] for person in name_index.prefix(prefix, limit)]
+
+
 def person_id_for_name(name):
     """
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
     """
-    person_ids = list(names.get(name.lower(), set()))
+    person_ids = list(person_ids_for_name(name))
     if len(person_ids) == 0:
         return None
     elif len(person_ids) > 1:
@@ -161,6 +379,11 @@ def neighbors_for_person(person_id):
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
+    if graph is not None:
+        return {
+            (graph.movie_ids[movie], graph.person_ids[person])
+            for movie, person in graph.neighbors(graph.person_index[person_id])
+        }
     movie_ids = people[person_id]["movies"]
     neighbors = set()
     for movie_id in movie_ids:
@@ -0,0 +1,285 @@
+from array import array
+from functools import cached_property
+
+
+class MovieGraph():
+    """
+    Compact, read-only form of the people/movies graph.
+
+    People and movies are renumbered 0..n-1 and their adjacency is stored
+    in compressed sparse row (CSR) form: the movies of person p are
+    person_movies[person_offsets[p]:person_offsets[p + 1]] and the stars
+    of movie m are movie_stars[movie_offsets[m]:movie_offsets[m + 1]].
+    """
+
+    def __init__(self, person_ids, movie_ids, person_offsets, person_movies,
+                 movie_offsets, movie_stars, person_index=None, movie_index=None):
+        self.person_ids = person_ids
+        self.movie_ids = movie_ids
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_stars = movie_stars
+
+        # Reuse the id indexes if the caller already has them
+        if person_index is not None:
+            self.person_index = person_index
+        if movie_index is not None:
+            self.movie_index = movie_index
+
+    @cached_property
+    def person_index(self):
+        """
+        Maps the original IMDB ids of people to their integer indexes,
+        built on first use since loading from a snapshot may not need it.
+        """
+        return {person_id: i for i, person_id in enumerate(self.person_ids)}
+
+    @cached_property
+    def movie_index(self):
+        """Maps the original IMDB ids of movies to their integer indexes."""
+        return {movie_id: i for i, movie_id in enumerate(self.movie_ids)}
+
+    @classmethod
+    def build(cls, people, movies):
+        """
+        Builds the graph from the people and movies dicts filled
+        by degrees.load_data.
+        """
+        person_ids = list(people)
+        movie_ids = list(movies)
+        person_index = {person_id: i for i, person_id in enumerate(person_ids)}
+        movie_index = {movie_id: i for i, movie_id in enumerate(movie_ids)}
+
+        person_offsets = array("i", [0])
+        person_movies = array("i")
+        for person_id in person_ids:
+            person_movies.extend(sorted(
+                movie_index[movie_id] for movie_id in people[person_id]["movies"]
+            ))
+            person_offsets.append(len(person_movies))
+
+        movie_offsets = array("i", [0])
+        movie_stars = array("i")
+        for movie_id in movie_ids:
+            movie_stars.extend(sorted(
+                person_index[person_id] for person_id in movies[movie_id]["stars"]
+            ))
+            movie_offsets.append(len(movie_stars))
+
+        return cls(person_ids, movie_ids, person_offsets, person_movies,
+                   movie_offsets, movie_stars, person_index, movie_index)
+
+    def neighbors(self, person):
+        """
+        Yields (movie, person) index pairs for people who starred
+        with the person at the given index.
+        """
+        person_offsets = self.person_offsets
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_stars = self.movie_stars
+        for i in range(person_offsets[person], person_offsets[person + 1]):
+            movie = person_movies[i]
+            for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                yield movie, movie_stars[j]
+
+    def breadth_first(self, source):
+        """
+        Runs a breadth-first search from the person at index source and
+        returns (distance, parent, via) arrays indexed by person: the
+        number of degrees from source, the previous person on a shortest
+        path and the movie connecting them. All three are -1 for people
+        who cannot be reached; source is its own parent.
+        """
+        n = len(self.person_ids)
+        distance = array("i", [-1]) * n
+        parent = array("i", [-1]) * n
+        via = array("i", [-1]) * n
+        distance[source] = 0
+        parent[source] = source
+
+        person_offsets = self.person_offsets
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_stars = self.movie_stars
+
+        layer = [source]
+        depth = 0
+        while layer:
+            depth += 1
+            next_layer = []
+            for person in layer:
+                for i in range(person_offsets[person], person_offsets[person + 1]):
+                    movie = person_movies[i]
+                    for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                        neighbor = movie_stars[j]
+                        if distance[neighbor] == -1:
+                            distance[neighbor] = depth
+                            parent[neighbor] = person
+                            via[neighbor] = movie
+                            next_layer.append(neighbor)
+            layer = next_layer
+
+        return distance, parent, via
+
+    def degree(self, person):
+        """
+        Returns the number of distinct people who starred with the
+        person at the given index, not counting themselves.
+        """
+        costars = {costar for _, costar in self.neighbors(person)}
+        costars.discard(person)
+        return len(costars)
+
+    def components(self):
+        """
+        Returns an array mapping each person to the id of their connected
+        component, numbering components 0, 1, ... in order of discovery.
+        """
+        n = len(self.person_ids)
+        component = array("i", [-1]) * n
+
+        person_offsets = self.person_offsets
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_stars = self.movie_stars
+
+        count = 0
+        for start in range(n):
+            if component[start] != -1:
+                continue
+            component[start] = count
+            stack = [start]
+            while stack:
+                person = stack.pop()
+                for i in range(person_offsets[person], person_offsets[person + 1]):
+                    movie = person_movies[i]
+                    for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                        neighbor = movie_stars[j]
+                        if component[neighbor] == -1:
+                            component[neighbor] = count
+                            stack.append(neighbor)
+            count += 1
+
+        return component
+
+    def shortest_path(self, source_id, target_id, landmarks=None):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs
+        that connect the source to the target, using a bidirectional
+        breadth-first search over the integer indexes.
+
+        If a LandmarkIndex is given, people in different components are
+        rejected without searching, and people whose lower bound shows
+        they cannot lie on a shortest path are never expanded.
+
+        If no possible path, returns None.
+        """
+        source = self.person_index[source_id]
+        target = self.person_index[target_id]
+        if source == target:
+            return []
+
+        upper = None
+        if landmarks is not None:
+            if not landmarks.connected(source, target):
+                return None
+            upper = landmarks.upper_bound(source, target)
+
+        # Parent person and connecting movie of every reached person,
+        # -1 while the person has not been reached
+        n = len(self.person_ids)
+        forward = array("i", [-1]) * n
+        forward_movie = array("i", [-1]) * n
+        backward = array("i", [-1]) * n
+        backward_movie = array("i", [-1]) * n
+        forward[source] = source
+        backward[target] = target
+        forward_layer = [source]
+        backward_layer = [target]
+        forward_depth = 0
+        backward_depth = 0
+
+        person_offsets = self.person_offsets
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_stars = self.movie_stars
+
+        while forward_layer and backward_layer:
+
+            # Always expand the smaller side, it touches fewer people
+            if len(forward_layer) <= len(backward_layer):
+                layer, parents, via, others = (
+                    forward_layer, forward, forward_movie, backward
+                )
+                forward_depth += 1
+                depth, end = forward_depth, target
+            else:
+                layer, parents, via, others = (
+                    backward_layer, backward, backward_movie, forward
+                )
+                backward_depth += 1
+                depth, end = backward_depth, source
+
+            # One landmark check per person, and none when it cannot prune
+            window = None
+            if upper is not None:
+                window = landmarks.window(end, upper - depth)
+            if window is not None:
+                distance, low, high = window
+
+            next_layer = []
+            meeting = -1
+            for person in layer:
+                for i in range(person_offsets[person], person_offsets[person + 1]):
+                    movie = person_movies[i]
+                    for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                        neighbor = movie_stars[j]
+                        if parents[neighbor] != -1:
+                            continue
+                        if window is not None and not (
+                            low <= distance[neighbor] <= high
+                        ):
+                            continue
+                        parents[neighbor] = person
+                        via[neighbor] = movie
+                        next_layer.append(neighbor)
+                        if meeting == -1 and others[neighbor] != -1:
+                            meeting = neighbor
+
+            if meeting != -1:
+                return self.join_paths(
+                    meeting, forward, forward_movie, backward, backward_movie
+                )
+
+            if parents is forward:
+                forward_layer = next_layer
+            else:
+                backward_layer = next_layer
+
+        return None
+
+    def join_paths(self, meeting, forward, forward_movie, backward, backward_movie):
+        """
+        Builds the list of (movie_id, person_id) pairs running from the
+        source through the meeting person to the target.
+        """
+        path = []
+
+        # Walk back from the meeting person to the source
+        person = meeting
+        while forward[person] != person:
+            path.append((self.movie_ids[forward_movie[person]],
+                         self.person_ids[person]))
+            person = forward[person]
+        path.reverse()
+
+        # Walk forward from the meeting person to the target
+        person = meeting
+        while backward[person] != person:
+            path.append((self.movie_ids[backward_movie[person]],
+                         self.person_ids[backward[person]]))
+            person = backward[person]
+
+        return path
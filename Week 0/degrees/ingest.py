@@ -0,0 +1,191 @@
+import csv
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Mapping
+
+from graph import MovieGraph
+
+
+def read_columns(directory):
+    """
+    Streams the CSV files of a data directory into column lists and a
+    MovieGraph, without building a dict per row.
+
+    Only the columns degrees.py uses are kept. Repeated names and years
+    are interned so they share one string object.
+    """
+    intern = sys.intern
+
+    person_ids = []
+    person_names = []
+    person_births = []
+    person_index = {}
+    with open(f"{directory}/people.csv", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        id_, name, birth = (header.index(column) for column in ["id", "name", "birth"])
+        for row in reader:
+            if row[id_] in person_index:
+                continue
+            person_index[row[id_]] = len(person_ids)
+            person_ids.append(row[id_])
+            person_names.append(intern(row[name]))
+            person_births.append(intern(row[birth]))
+
+    movie_ids = []
+    movie_titles = []
+    movie_years = []
+    movie_index = {}
+    with open(f"{directory}/movies.csv", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        id_, title, year = (header.index(column) for column in ["id", "title", "year"])
+        for row in reader:
+            if row[id_] in movie_index:
+                continue
+            movie_index[row[id_]] = len(movie_ids)
+            movie_ids.append(row[id_])
+            movie_titles.append(row[title])
+            movie_years.append(intern(row[year]))
+
+    # Keep each starring as a pair of integer indexes
+    star_people = array("i")
+    star_movies = array("i")
+    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        person_id, movie_id = (header.index(column) for column in ["person_id", "movie_id"])
+        for row in reader:
+            try:
+                person = person_index[row[person_id]]
+                movie = movie_index[row[movie_id]]
+            except KeyError:
+                continue
+            star_people.append(person)
+            star_movies.append(movie)
+
+    person_offsets, person_movies = compress(star_people, star_movies, len(person_ids))
+    movie_offsets, movie_stars = compress(star_movies, star_people, len(movie_ids))
+
+    return {
+        "person_ids": person_ids,
+        "person_names": person_names,
+        "person_births": person_births,
+        "movie_ids": movie_ids,
+        "movie_titles": movie_titles,
+        "movie_years": movie_years,
+        "graph": MovieGraph(person_ids, movie_ids, person_offsets, person_movies,
+                            movie_offsets, movie_stars, person_index, movie_index)
+    }
+
+
+def compress(rows, columns, n):
+    """
+    Returns the (offsets, indexes) CSR arrays of the (row, column)
+    pairs, for rows 0 to n - 1, with the columns of each row sorted
+    and duplicates dropped.
+    """
+    # Count the pairs of each row, then turn the counts into offsets
+    starts = array("i", [0]) * (n + 1)
+    for row in rows:
+        starts[row + 1] += 1
+    for i in range(n):
+        starts[i + 1] += starts[i]
+
+    # Place every column in its row's slot
+    unsorted = array("i", [0]) * len(rows)
+    position = array("i", starts)
+    for row, column in zip(rows, columns):
+        unsorted[position[row]] = column
+        position[row] += 1
+
+    offsets = array("i", [0])
+    indexes = array("i")
+    for i in range(n):
+        indexes.extend(sorted(set(unsorted[starts[i]:starts[i + 1]])))
+        offsets.append(len(indexes))
+    return offsets, indexes
+
+
+class Records(Mapping):
+    """
+    Read-only mapping of ids to dicts of fields, like degrees.people
+    and degrees.movies, but stored as one list per field.
+    The dict for an id is only built when it is looked up.
+
+    index maps ids to positions in the columns; it may instead be a
+    function returning that mapping, called on the first lookup.
+    """
+
+    def __init__(self, ids, index, columns):
+        self.ids = ids
+        self.index = index
+        self.columns = columns
+
+    def __getitem__(self, id_):
+        if callable(self.index):
+            self.index = self.index()
+        i = self.index[id_]
+        return {field: column[i] for field, column in self.columns.items()}
+
+    def __iter__(self):
+        return iter(self.ids)
+
+    def __len__(self):
+        return len(self.ids)
+
+
+class NameIndex():
+    """
+    Sorted index of names supporting case-insensitive exact and
+    prefix lookups by binary search.
+
+    Both the sorted order and the keys are built on first use. The
+    order can be given instead, as saved by a snapshot, so that loading
+    one never sorts the names again.
+    """
+
+    def __init__(self, names, order=None):
+        self.names = names
+        self.order = order
+        self.sorted_keys = None
+
+    @property
+    def people(self):
+        """Indexes of people sorted by name, ignoring case."""
+        if self.order is None:
+            names = self.names
+            self.order = array("i", sorted(range(len(names)), key=lambda i: names[i].casefold()))
+        return self.order
+
+    @property
+    def keys(self):
+        """The casefolded names in sorted order."""
+        if self.sorted_keys is None:
+            names = self.names
+            self.sorted_keys = [names[i].casefold() for i in self.people]
+        return self.sorted_keys
+
+    def lookup(self, name):
+        """
+        Returns the indexes of people whose name matches name,
+        ignoring case.
+        """
+        key = name.casefold()
+        start = bisect_left(self.keys, key)
+        stop = bisect_right(self.keys, key, start)
+        return list(self.people[start:stop])
+
+    def prefix(self, prefix, limit=None):
+        """
+        Returns the indexes of people whose name starts with prefix,
+        ignoring case, in name order and at most limit of them.
+        """
+        key = prefix.casefold()
+        start = bisect_left(self.keys, key)
+        stop = start
+        while (stop < len(self.keys) and self.keys[stop].startswith(key)
+               and (limit is None or stop - start < limit)):
+            stop += 1
+        return list(self.people[start:stop])
@@ -0,0 +1,149 @@
+import os
+import pickle
+from functools import cached_property
+
+# Bump VERSION whenever the stored fields below change
+VERSION = 1
+
+# Number of landmarks picked by default
+DEFAULT_LANDMARKS = 8
+
+
+def landmarks_path(directory):
+    """
+    Returns the path of the landmark index file for a data directory.
+    """
+    return os.path.join(directory, "degrees.landmarks")
+
+
+class LandmarkIndex():
+    """
+    Precomputed breadth-first distances from a few well-connected
+    people (the landmarks) to everyone, plus connected component ids.
+
+    By the triangle inequality, for any landmark L,
+    |d(L, a) - d(L, b)| <= d(a, b) <= d(L, a) + d(L, b),
+    which bounds the separation of any two people without searching.
+    """
+
+    def __init__(self, landmarks, distances, components):
+        self.landmarks = landmarks
+        self.distances = distances
+        self.components = components
+
+    @cached_property
+    def eccentricities(self):
+        """
+        The distance from each landmark to the furthest person it reaches.
+        """
+        return [max(distance) for distance in self.distances]
+
+    @classmethod
+    def build(cls, graph, count=DEFAULT_LANDMARKS):
+        """
+        Builds the index for a MovieGraph, using the count people
+        with the most co-stars as landmarks.
+        """
+        people = sorted(range(len(graph.person_ids)), key=graph.degree, reverse=True)
+        landmarks = people[:count]
+        distances = [graph.breadth_first(landmark)[0] for landmark in landmarks]
+        return cls(landmarks, distances, graph.components())
+
+    def connected(self, a, b):
+        """
+        Returns True if the people at indexes a and b are connected.
+        """
+        return self.components[a] == self.components[b]
+
+    def lower_bound(self, a, b):
+        """
+        Returns a lower bound on the degrees of separation of the
+        connected people at indexes a and b.
+        """
+        bound = 0
+        for distance in self.distances:
+            # Landmarks in another component say nothing about a and b
+            if distance[a] != -1:
+                bound = max(bound, abs(distance[a] - distance[b]))
+        return bound
+
+    def window(self, b, slack):
+        """
+        Returns (distances, low, high) for the landmark that best shows
+        people are more than slack steps from the person at index b:
+        any connected person whose distance from the landmark is outside
+        [low, high] is. Returns None if no landmark can rule anyone out,
+        so that checking would be wasted.
+        """
+        best = None
+        best_excluded = 0
+        for distance, eccentricity in zip(self.distances, self.eccentricities):
+            if distance[b] == -1:
+                continue
+            low, high = distance[b] - slack, distance[b] + slack
+            # Number of possible distances outside the window
+            excluded = max(low, 0) + max(eccentricity - high, 0)
+            if excluded > best_excluded:
+                best = (distance, low, high)
+                best_excluded = excluded
+        return best
+
+    def upper_bound(self, a, b):
+        """
+        Returns an upper bound on the degrees of separation of the
+        connected people at indexes a and b, or None if no landmark
+        shares their component.
+        """
+        bound = None
+        for distance in self.distances:
+            if distance[a] != -1:
+                through = distance[a] + distance[b]
+                if bound is None or through < bound:
+                    bound = through
+        return bound
+
+    def bounds(self, a, b):
+        """
+        Returns (lower, upper) bounds on the degrees of separation of
+        the people at indexes a and b, or None if they are not connected.
+        """
+        if not self.connected(a, b):
+            return None
+        return self.lower_bound(a, b), self.upper_bound(a, b)
+
+    def save(self, path, key):
+        """
+        Writes the index to path, tagged with the key of the data
+        it was built from.
+        """
+        temporary = path + ".tmp"
+        with open(temporary, "wb") as f:
+            pickle.dump({
+                "version": VERSION,
+                "key": key,
+                "landmarks": self.landmarks,
+                "distances": self.distances,
+                "components": self.components
+            }, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path, key):
+        """
+        Reads the index at path, or returns None if there is none or it
+        was built by another version or from different data.
+        """
+        try:
+            with open(path, "rb") as f:
+                data = pickle.load(f)
+        except Exception:
+            # Unpickling a damaged file can raise almost anything
+            return None
+        if not isinstance(data, dict):
+            return None
+        if data.get("version") != VERSION or data.get("key") != key:
+            return None
+        try:
+            return cls(data["landmarks"], data["distances"], data["components"])
+        except KeyError:
+            return None
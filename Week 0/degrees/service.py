@@ -0,0 +1,159 @@
+import csv
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import degrees
+
+# Number of worker threads answering queries in server mode
+WORKERS = os.cpu_count() or 4
+
+USAGE = ("Usage: python service.py batch [--snapshot] directory [queries.csv]\n"
+         "       python service.py serve [--snapshot] directory [port]")
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if arg != "--snapshot"]
+    snapshot = len(args) != len(sys.argv) - 1
+    if len(args) not in [2, 3] or args[0] not in ["batch", "serve"]:
+        sys.exit(USAGE)
+    mode, directory = args[0], args[1]
+
+    # Load data once, it stays resident for every query
+    print("Loading data...", file=sys.stderr)
+    degrees.load_data(directory, snapshot=snapshot, streaming=True)
+    print("Data loaded.", file=sys.stderr)
+
+    if mode == "batch":
+        if len(args) == 3:
+            with open(args[2], encoding="utf-8") as f:
+                run_batch(f, sys.stdout)
+        else:
+            run_batch(sys.stdin, sys.stdout)
+    else:
+        port = int(args[2]) if len(args) == 3 else 8000
+        serve(port)
+
+
+def resolve(name):
+    """
+    Returns the IMDB id for a person's name without prompting.
+
+    Raises ValueError if no one or more than one person has that name.
+    """
+    person_ids = degrees.person_ids_for_name(name.strip())
+    if len(person_ids) == 0:
+        raise ValueError(f"person not found: {name}")
+    elif len(person_ids) > 1:
+        raise ValueError(f"ambiguous name: {name} ({', '.join(sorted(person_ids))})")
+    return next(iter(person_ids))
+
+
+def answer(source_name, target_name):
+    """
+    Returns a JSON-serializable dict answering one query: the degrees of
+    separation and the path between the two people, or an error.
+    """
+    query = {"source": source_name, "target": target_name}
+    try:
+        source = resolve(source_name)
+        target = resolve(target_name)
+    except ValueError as e:
+        return {**query, "error": str(e)}
+
+    path = degrees.shortest_path(source, target)
+    if path is None:
+        return {**query, "degrees": None, "path": None}
+    return {**query, "degrees": len(path), "path": [
+        {
+            "movie_id": movie_id,
+            "title": degrees.movies[movie_id]["title"],
+            "person_id": person_id,
+            "name": degrees.people[person_id]["name"]
+        }
+        for movie_id, person_id in path
+    ]}
+
+
+def run_batch(queries, out):
+    """
+    Answers every source,target pair of names read from queries,
+    writing one JSON object per line to out.
+    """
+    for row in csv.reader(queries):
+        if not row or not "".join(row).strip():
+            continue
+        if len(row) != 2:
+            result = {"error": f"expected source,target: {','.join(row)}"}
+        else:
+            result = answer(row[0], row[1])
+        out.write(json.dumps(result) + "\n")
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    """
+    Answers GET /path?source=NAME&target=NAME with the JSON of answer.
+    """
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+        if url.path != "/path" or "source" not in params or "target" not in params:
+            self.reply(400, {"error": "expected /path?source=NAME&target=NAME"})
+            return
+        self.reply(200, answer(params["source"][0], params["target"][0]))
+
+    def reply(self, status, result):
+        body = json.dumps(result).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class PoolHTTPServer(HTTPServer):
+    """
+    HTTP server handing each request to a fixed pool of worker threads.
+    """
+
+    def __init__(self, address, handler, workers=WORKERS):
+        super().__init__(address, handler)
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self.process_request_thread, request, client_address)
+
+    def process_request_thread(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=True)
+
+
+def serve(port, host="127.0.0.1"):
+    """
+    Serves queries on host:port until interrupted.
+    """
+    server = PoolHTTPServer((host, port), QueryHandler)
+    print(f"Serving on http://{host}:{port}/path?source=NAME&target=NAME",
+          file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
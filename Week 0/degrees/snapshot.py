@@ -0,0 +1,134 @@
+import mmap
+import os
+import pickle
+import struct
+import sys
+import zlib
+from array import array
+
+from graph import MovieGraph
+
+# Bump VERSION whenever the layout below changes
+MAGIC = b"DEGREES\0"
+VERSION = 2
+
+# Magic, version, header length, CRC-32 of everything after the preamble
+PREAMBLE = struct.Struct("<8sIII")
+
+FILES = ["people.csv", "movies.csv", "stars.csv"]
+
+
+def snapshot_path(directory):
+    """
+    Returns the path of the snapshot file for a data directory.
+    """
+    return os.path.join(directory, "degrees.snapshot")
+
+
+def snapshot_key(directory):
+    """
+    Returns the size and modification time of each CSV file, so a
+    snapshot is only reused while the files are unchanged.
+    """
+    key = []
+    for filename in FILES:
+        stat = os.stat(os.path.join(directory, filename))
+        key.append((filename, stat.st_size, stat.st_mtime_ns))
+    return key
+
+
+def write_snapshot(path, key, people, movies, graph, name_index):
+    """
+    Writes people, movies, the compiled graph and the sorted order of
+    the name index to path.
+
+    The file is a pickled header with the key and the string columns,
+    followed by the four CSR arrays of the graph and the name order as
+    raw int32 data so they can be memory-mapped back without copying.
+    If writing fails, no partial file is left behind.
+    """
+    arrays = [graph.person_offsets, graph.person_movies,
+              graph.movie_offsets, graph.movie_stars, name_index.people]
+    header = pickle.dumps({
+        "key": key,
+        "byteorder": sys.byteorder,
+        "person_ids": graph.person_ids,
+        "person_names": [people[person_id]["name"] for person_id in graph.person_ids],
+        "person_births": [people[person_id]["birth"] for person_id in graph.person_ids],
+        "movie_ids": graph.movie_ids,
+        "movie_titles": [movies[movie_id]["title"] for movie_id in graph.movie_ids],
+        "movie_years": [movies[movie_id]["year"] for movie_id in graph.movie_ids],
+        "lengths": [len(a) for a in arrays]
+    }, protocol=pickle.HIGHEST_PROTOCOL)
+
+    # Pad the header so the arrays start 4-byte aligned
+    padding = b"\0" * (-(PREAMBLE.size + len(header)) % 4)
+    body = [header, padding] + [array("i", a).tobytes() for a in arrays]
+    checksum = 0
+    for part in body:
+        checksum = zlib.crc32(part, checksum)
+
+    # Write to a temporary file first so readers never see half a snapshot
+    temporary = path + ".tmp"
+    try:
+        with open(temporary, "wb") as f:
+            f.write(PREAMBLE.pack(MAGIC, VERSION, len(header), checksum))
+            for part in body:
+                f.write(part)
+        os.replace(temporary, path)
+    except OSError:
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
+        raise
+
+
+def read_snapshot(path, key):
+    """
+    Memory-maps the snapshot at path and returns a dict with the
+    person and movie columns, a MovieGraph whose arrays point into the
+    mapping, and the name order of the name index.
+
+    Returns None if there is no snapshot, it is truncated or corrupt,
+    or it was written by another version or from different CSV files.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    if len(data) < PREAMBLE.size:
+        return None
+    magic, version, header_length, checksum = PREAMBLE.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        return None
+    if zlib.crc32(memoryview(data)[PREAMBLE.size:]) != checksum:
+        return None
+
+    # The checksum catches damaged files, but unpickling can raise
+    # almost anything on a file that is not a snapshot at all
+    offset = PREAMBLE.size + header_length
+    try:
+        header = pickle.loads(data[PREAMBLE.size:offset])
+        if not isinstance(header, dict):
+            return None
+        if header["key"] != key or header["byteorder"] != sys.byteorder:
+            return None
+
+        offset += -offset % 4
+        arrays = []
+        for length in header["lengths"]:
+            size = length * array("i").itemsize
+            if offset + size > len(data):
+                return None
+            arrays.append(memoryview(data)[offset:offset + size].cast("i"))
+            offset += size
+
+        *graph_arrays, name_order = arrays
+        header["graph"] = MovieGraph(header["person_ids"], header["movie_ids"], *graph_arrays)
+        header["name_order"] = name_order
+    except Exception:
+        return None
+    return header
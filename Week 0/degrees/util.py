@@ -1,3 +1,8 @@
+import heapq
+import itertools
+from collections import deque
+
+
 class Node():
     def __init__(self, state, parent, action):
         self.state = state
@@ -36,3 +41,81 @@ class QueueFrontier(StackFrontier):
             node = self.frontier[0]
             self.frontier = self.frontier[1:]
             return node
+
+
+class DequeStackFrontier():
+    """
+    Stack frontier backed by a deque, with a count of the nodes of
+    each state in the frontier so membership checks are O(1).
+    """
+    def __init__(self):
+        self.frontier = deque()
+        self.states = {}
+
+    def add(self, node):
+        self.frontier.append(node)
+        self.states[node.state] = self.states.get(node.state, 0) + 1
+
+    def contains_state(self, state):
+        return state in self.states
+
+    def empty(self):
+        return len(self.frontier) == 0
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = self.frontier.pop()
+            self.states[node.state] -= 1
+            if self.states[node.state] == 0:
+                del self.states[node.state]
+            return node
+
+
+class DequeQueueFrontier(DequeStackFrontier):
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = self.frontier.popleft()
+            self.states[node.state] -= 1
+            if self.states[node.state] == 0:
+                del self.states[node.state]
+            return node
+
+
+class PriorityFrontier():
+    """
+    Frontier backed by a binary heap that always removes the node
+    with the lowest priority(node), for greedy best-first search and A*.
+    Ties are broken in insertion order.
+    """
+    def __init__(self, priority):
+        self.priority = priority
+        self.frontier = []
+        self.states = {}
+        self.counter = itertools.count()
+
+    def add(self, node):
+        heapq.heappush(
+            self.frontier, (self.priority(node), next(self.counter), node)
+        )
+        self.states[node.state] = self.states.get(node.state, 0) + 1
+
+    def contains_state(self, state):
+        return state in self.states
+
+    def empty(self):
+        return len(self.frontier) == 0
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = heapq.heappop(self.frontier)[2]
+            self.states[node.state] -= 1
+            if self.states[node.state] == 0:
+                del self.states[node.state]
+            return node
@@ -0,0 +1,128 @@
+import csv
+import multiprocessing
+import os
+import sys
+import tempfile
+import tracemalloc
+
+from generate import GENERATORS, generate, write_maze
+from grid import GridMaze, GRID_STRATEGIES
+from maze import Maze, STRATEGIES
+
+# Maze sizes (height and width) and seeds used when none are given
+SIZES = [21, 41, 81]
+SEEDS = 3
+
+# Seconds a solver may take on one maze before its row reads "timeout"
+TIME_LIMIT = 10
+
+FIELDS = ["generator", "height", "width", "seed", "solver", "seconds", "peak_kb",
+          "explored", "max_frontier", "path_length"]
+
+
+def solvers():
+    """
+    Returns (name, maze class, strategy) for every solver:
+    each Maze strategy and each GridMaze strategy.
+    """
+    return ([(strategy, Maze, strategy) for strategy in STRATEGIES]
+            + [(f"grid-{strategy}", GridMaze, strategy) for strategy in GRID_STRATEGIES])
+
+
+def measure(maze_class, strategy, filename):
+    """
+    Solves the maze in filename and returns its statistics. Time comes
+    from an untraced run, since tracemalloc slows allocation down, and
+    peak memory from a second, traced run.
+    """
+    m = maze_class(filename)
+    m.solve(strategy)
+    seconds = m.solve_time
+
+    m = maze_class(filename)
+    tracemalloc.start()
+    try:
+        m.solve(strategy)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "seconds": f"{seconds:.6f}",
+        "peak_kb": peak // 1024,
+        "explored": m.num_explored,
+        "max_frontier": m.max_frontier,
+        "path_length": len(m.solution[0])
+    }
+
+
+def measure_in_process(connection, maze_class, strategy, filename):
+    """Sends the result of measure, or the exception it raised, to connection."""
+    try:
+        connection.send(measure(maze_class, strategy, filename))
+    except Exception as e:
+        connection.send(e)
+    finally:
+        connection.close()
+
+
+def measure_with_limit(maze_class, strategy, filename, time_limit=TIME_LIMIT):
+    """
+    Returns the statistics of measure, run in a separate process so it
+    can be stopped, or None if it takes longer than time_limit seconds.
+    """
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(
+        target=measure_in_process, args=(sender, maze_class, strategy, filename)
+    )
+    process.start()
+    sender.close()
+    try:
+        if not receiver.poll(time_limit):
+            return None
+        result = receiver.recv()
+    finally:
+        process.terminate()
+        process.join()
+        receiver.close()
+    if isinstance(result, Exception):
+        raise result
+    return result
+
+
+def benchmark(sizes, seeds, out, time_limit=TIME_LIMIT):
+    """
+    Runs every solver on a maze from every generator at every size and
+    seed, writing one CSV row per run to out. A run that takes longer
+    than time_limit seconds is stopped and its row reads "timeout".
+    """
+    writer = csv.DictWriter(out, fieldnames=FIELDS)
+    writer.writeheader()
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "maze.txt")
+        for generator in GENERATORS:
+            for size in sizes:
+                for seed in range(seeds):
+                    rows = generate(generator, size, size, seed)
+                    write_maze(filename, rows)
+                    for name, maze_class, strategy in solvers():
+                        # Record the maze as generated, since some
+                        # generators round even sizes down
+                        row = {"generator": generator, "height": len(rows),
+                               "width": len(rows[0]), "seed": seed, "solver": name}
+                        stats = measure_with_limit(maze_class, strategy, filename, time_limit)
+                        row.update(stats or {"seconds": "timeout"})
+                        writer.writerow(row)
+                        out.flush()
+
+
+def main():
+    try:
+        sizes = [int(arg) for arg in sys.argv[1:]] or SIZES
+    except ValueError:
+        sys.exit("Usage: python benchmark.py [size ...]")
+    benchmark(sizes, SEEDS, sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
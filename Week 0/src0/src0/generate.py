@@ -0,0 +1,148 @@
+import random
+import sys
+
+# Maze generators accepted by generate
+GENERATORS = ["backtracker", "prim", "random"]
+
+# Share of cells turned into walls by random_fill
+DENSITY = 0.3
+
+
+def generate(generator, height, width, seed=None):
+    """
+    Returns a maze as a list of strings in the format read by Maze,
+    with the start in the top left and the goal in the bottom right.
+
+    backtracker and prim build perfect mazes (exactly one path between
+    any two cells) on a grid of odd size, so even sizes are rounded down.
+    random fills cells at random and then carves a path so that the
+    goal is always reachable.
+    """
+    if height < 1 or width < 1:
+        raise ValueError("maze is too small for a start and a goal")
+
+    rng = random.Random(seed)
+    if generator == "backtracker":
+        grid = backtracker(height, width, rng)
+    elif generator == "prim":
+        grid = prim(height, width, rng)
+    elif generator == "random":
+        grid = random_fill(height, width, rng)
+    else:
+        raise ValueError(f"unknown generator {generator}")
+    if len(grid) * len(grid[0]) < 2:
+        raise ValueError("maze is too small for a start and a goal")
+
+    grid[0][0] = "A"
+    grid[-1][-1] = "B"
+    return ["".join(row) for row in grid]
+
+
+def walled_grid(height, width):
+    """
+    Returns a grid of walls of odd height and width. Generators treat
+    the cells with even coordinates as rooms and join them by knocking
+    down the walls between them.
+    """
+    height -= (height + 1) % 2
+    width -= (width + 1) % 2
+    return [["#"] * width for _ in range(height)]
+
+
+def rooms_next_to(grid, room):
+    """Returns the rooms two cells away from room in each direction."""
+    i, j = room
+    return [
+        (i + di, j + dj)
+        for di, dj in [(-2, 0), (2, 0), (0, -2), (0, 2)]
+        if 0 <= i + di < len(grid) and 0 <= j + dj < len(grid[0])
+    ]
+
+
+def backtracker(height, width, rng):
+    """
+    Recursive backtracker: a randomized depth-first search that knocks
+    down walls as it goes and backs up at dead ends. Makes long,
+    winding corridors.
+    """
+    grid = walled_grid(height, width)
+    grid[0][0] = " "
+    stack = [(0, 0)]
+    while stack:
+        room = stack[-1]
+        unvisited = [r for r in rooms_next_to(grid, room) if grid[r[0]][r[1]] == "#"]
+        if not unvisited:
+            stack.pop()
+            continue
+        i, j = rng.choice(unvisited)
+        grid[(room[0] + i) // 2][(room[1] + j) // 2] = " "
+        grid[i][j] = " "
+        stack.append((i, j))
+    return grid
+
+
+def prim(height, width, rng):
+    """
+    Randomized Prim's algorithm: grows the maze from one room by
+    repeatedly joining a random room on its edge. Makes many short
+    dead ends.
+    """
+    grid = walled_grid(height, width)
+    grid[0][0] = " "
+
+    # Rooms on the edge, as a list to pick from and a set to check against
+    edge = rooms_next_to(grid, (0, 0))
+    on_edge = set(edge)
+    while edge:
+        # Swap a random room to the end so it can be removed in O(1)
+        k = rng.randrange(len(edge))
+        edge[k], edge[-1] = edge[-1], edge[k]
+        i, j = edge.pop()
+        joined = [r for r in rooms_next_to(grid, (i, j)) if grid[r[0]][r[1]] == " "]
+        room = rng.choice(joined)
+        grid[(room[0] + i) // 2][(room[1] + j) // 2] = " "
+        grid[i][j] = " "
+        for r in rooms_next_to(grid, (i, j)):
+            if grid[r[0]][r[1]] == "#" and r not in on_edge:
+                on_edge.add(r)
+                edge.append(r)
+    return grid
+
+
+def random_fill(height, width, rng, density=DENSITY):
+    """
+    Turns each cell into a wall with probability density, then clears a
+    random staircase path from the top left to the bottom right.
+    """
+    grid = [
+        ["#" if rng.random() < density else " " for _ in range(width)]
+        for _ in range(height)
+    ]
+    i, j = 0, 0
+    grid[0][0] = " "
+    while (i, j) != (height - 1, width - 1):
+        if j == width - 1 or (i < height - 1 and rng.random() < 0.5):
+            i += 1
+        else:
+            j += 1
+        grid[i][j] = " "
+    return grid
+
+
+def write_maze(filename, rows):
+    """Writes the rows of a maze to filename."""
+    with open(filename, "w") as f:
+        f.write("\n".join(rows) + "\n")
+
+
+def main():
+    if len(sys.argv) not in [5, 6] or sys.argv[1] not in GENERATORS:
+        sys.exit(f"Usage: python generate.py {'|'.join(GENERATORS)} "
+                 "height width maze.txt [seed]")
+    generator, height, width, filename = sys.argv[1:5]
+    seed = int(sys.argv[5]) if len(sys.argv) == 6 else None
+    write_maze(filename, generate(generator, int(height), int(width), seed))
+
+
+if __name__ == "__main__":
+    main()
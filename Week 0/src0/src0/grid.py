@@ -0,0 +1,219 @@
+import heapq
+import time
+from array import array
+from collections import deque
+
+from render import cell_kinds, save_image, text_rows
+
+# Actions in the same order as the neighbor offsets of a GridMaze
+ACTIONS = ["up", "down", "left", "right"]
+
+# Search strategies accepted by GridMaze.solve
+GRID_STRATEGIES = ["bfs", "dfs", "astar"]
+
+# Maps each byte of a maze file to 1 for walls and 0 for open cells
+WALL_TABLE = bytes(0 if chr(b) in " AB" else 1 for b in range(256))
+
+# Marks the start cell in came_from
+START = 255
+
+
+class GridMaze():
+    """
+    Maze stored as a flat bytearray with one byte per cell instead of a
+    list of lists, for mazes too large for Maze.
+
+    Cells are integer ids into the array. The grid is surrounded by a
+    border of walls, so a neighbor is just the cell id plus one of four
+    precomputed offsets and never needs a bounds check.
+    """
+
+    def __init__(self, filename):
+
+        # Read file and set height and width of maze
+        with open(filename) as f:
+            contents = f.read()
+
+        # Validate start and goal
+        if contents.count("A") != 1:
+            raise Exception("maze must have exactly one start point")
+        if contents.count("B") != 1:
+            raise Exception("maze must have exactly one goal")
+
+        # Determine height and width of maze
+        contents = contents.splitlines()
+        self.height = len(contents)
+        self.width = max(len(line) for line in contents)
+        self.stride = self.width + 2
+
+        # Fill in the rows inside the border of walls; short lines are
+        # open to the right, as in Maze
+        self.walls = bytearray(b"\x01") * (self.stride * (self.height + 2))
+        for i, line in enumerate(contents):
+            row = line.encode("latin-1", "replace").translate(WALL_TABLE)
+            start = self.cell((i, 0))
+            self.walls[start:start + self.width] = row.ljust(self.width, b"\x00")
+            if "A" in line:
+                self.start = (i, line.index("A"))
+            if "B" in line:
+                self.goal = (i, line.index("B"))
+
+        # Offsets to the up, down, left and right neighbors of a cell
+        self.offsets = (-self.stride, self.stride, -1, 1)
+
+        self.solution = None
+
+    def cell(self, position):
+        """Returns the cell id of a (row, column) position."""
+        return (position[0] + 1) * self.stride + position[1] + 1
+
+    def position(self, cell):
+        """Returns the (row, column) position of a cell id."""
+        row, col = divmod(cell, self.stride)
+        return (row - 1, col - 1)
+
+    def neighbors(self, cell):
+        """Returns (action, cell) pairs for the open neighbors of a cell."""
+        walls = self.walls
+        return [
+            (action, cell + offset)
+            for action, offset in zip(ACTIONS, self.offsets)
+            if not walls[cell + offset]
+        ]
+
+    def solve(self, strategy="bfs"):
+        """
+        Finds a solution to maze, if one exists, using one of
+        GRID_STRATEGIES. Records the number of states explored, the
+        peak frontier size and the time taken.
+
+        Instead of nodes, came_from keeps one byte per cell: the index
+        of the action that reached it plus one, 0 while unreached.
+        """
+        if strategy not in GRID_STRATEGIES:
+            raise ValueError(f"unknown strategy {strategy}")
+
+        self.num_explored = 0
+        self.max_frontier = 0
+        self.came_from = bytearray(len(self.walls))
+
+        started = time.perf_counter()
+        try:
+            if strategy == "astar":
+                found = self.search_astar()
+            else:
+                found = self.search_uninformed(depth_first=strategy == "dfs")
+        finally:
+            self.solve_time = time.perf_counter() - started
+        if not found:
+            raise Exception("no solution")
+
+        # Follow came_from back from the goal to find solution
+        actions = []
+        cells = []
+        cell = self.cell(self.goal)
+        while self.came_from[cell] != START:
+            k = self.came_from[cell] - 1
+            actions.append(ACTIONS[k])
+            cells.append(self.position(cell))
+            cell -= self.offsets[k]
+        actions.reverse()
+        cells.reverse()
+        self.solution = (actions, cells)
+
+    def search_uninformed(self, depth_first=False):
+        """
+        Breadth-first (or depth-first) search from start to goal,
+        returning True if the goal was reached.
+        """
+        walls = self.walls
+        came_from = self.came_from
+        offsets = self.offsets
+        goal = self.cell(self.goal)
+        start = self.cell(self.start)
+
+        frontier = deque([start])
+        came_from[start] = START
+        remove = frontier.pop if depth_first else frontier.popleft
+        while frontier:
+            if len(frontier) > self.max_frontier:
+                self.max_frontier = len(frontier)
+            cell = remove()
+            self.num_explored += 1
+            if cell == goal:
+                return True
+            for k in range(4):
+                neighbor = cell + offsets[k]
+                if not walls[neighbor] and not came_from[neighbor]:
+                    came_from[neighbor] = k + 1
+                    frontier.append(neighbor)
+        return False
+
+    def search_astar(self):
+        """
+        A* search from start to goal with the Manhattan heuristic,
+        returning True if the goal was reached.
+        """
+        walls = self.walls
+        came_from = self.came_from
+        offsets = self.offsets
+        stride = self.stride
+        goal = self.cell(self.goal)
+        goal_row, goal_col = divmod(goal, stride)
+        start = self.cell(self.start)
+
+        # Cost of the cheapest known path to each cell, -1 while unknown
+        cost = array("i", [-1]) * len(walls)
+        closed = bytearray(len(walls))
+
+        cost[start] = 0
+        came_from[start] = START
+        frontier = [(0, start)]
+        while frontier:
+            if len(frontier) > self.max_frontier:
+                self.max_frontier = len(frontier)
+            _, cell = heapq.heappop(frontier)
+            if closed[cell]:
+                continue
+            closed[cell] = 1
+            self.num_explored += 1
+            if cell == goal:
+                return True
+            g = cost[cell] + 1
+            for k in range(4):
+                neighbor = cell + offsets[k]
+                if walls[neighbor] or closed[neighbor]:
+                    continue
+                if cost[neighbor] == -1 or g < cost[neighbor]:
+                    cost[neighbor] = g
+                    came_from[neighbor] = k + 1
+                    row, col = divmod(neighbor, stride)
+                    h = abs(row - goal_row) + abs(col - goal_col)
+                    heapq.heappush(frontier, (g + h, neighbor))
+        return False
+
+    def rows(self):
+        """Returns the wall bytes of each row, without the border."""
+        return [
+            self.walls[self.cell((i, 0)):self.cell((i, 0)) + self.width]
+            for i in range(self.height)
+        ]
+
+    def print(self):
+        marks = {}
+        if self.solution is not None:
+            marks.update((cell, "*") for cell in self.solution[1])
+        marks[self.start] = "A"
+        marks[self.goal] = "B"
+        print()
+        print("\n".join(text_rows(self.rows(), marks)))
+        print()
+
+    def output_image(self, filename, show_solution=True, cell_size=None,
+                     cell_border=None):
+        solution = self.solution[1] if self.solution is not None else None
+        kinds = cell_kinds(
+            self.rows(), self.start, self.goal,
+            solution=solution if solution is not None and show_solution else ()
+        )
+        save_image(filename, kinds, self.width, self.height, cell_size, cell_border)
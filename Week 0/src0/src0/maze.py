@@ -1,10 +1,26 @@
+import heapq
+import itertools
+import math
 import sys
+import time
+from collections import deque
+
+from grid import GridMaze, GRID_STRATEGIES
+from render import cell_kinds, save_image, text_rows
+
+# Search strategies accepted by Maze.solve
+STRATEGIES = ["dfs", "bfs", "greedy", "astar", "idastar", "jps", "field"]
+
+# Names of the actions moving one cell in each (row, column) direction
+DIRECTIONS = {(-1, 0): "up", (1, 0): "down", (0, -1): "left", (0, 1): "right"}
+
 
 class Node():
-    def __init__(self, state, parent, action):
+    def __init__(self, state, parent, action, cost=0):
         self.state = state
         self.parent = parent
         self.action = action
+        self.cost = cost
 
 
 class StackFrontier():
@@ -39,6 +55,85 @@ class QueueFrontier(StackFrontier):
             self.frontier = self.frontier[1:]
             return node
 
+
+class DequeStackFrontier():
+    """
+    Stack frontier backed by a deque, with a count of the nodes of
+    each state in the frontier so membership checks are O(1).
+    """
+    def __init__(self):
+        self.frontier = deque()
+        self.states = {}
+
+    def add(self, node):
+        self.frontier.append(node)
+        self.states[node.state] = self.states.get(node.state, 0) + 1
+
+    def contains_state(self, state):
+        return state in self.states
+
+    def empty(self):
+        return len(self.frontier) == 0
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = self.frontier.pop()
+            self.states[node.state] -= 1
+            if self.states[node.state] == 0:
+                del self.states[node.state]
+            return node
+
+
+class DequeQueueFrontier(DequeStackFrontier):
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = self.frontier.popleft()
+            self.states[node.state] -= 1
+            if self.states[node.state] == 0:
+                del self.states[node.state]
+            return node
+
+
+class PriorityFrontier():
+    """
+    Frontier backed by a binary heap that always removes the node
+    with the lowest priority(node), for greedy best-first search and A*.
+    Ties are broken in insertion order.
+    """
+    def __init__(self, priority):
+        self.priority = priority
+        self.frontier = []
+        self.states = {}
+        self.counter = itertools.count()
+
+    def add(self, node):
+        heapq.heappush(
+            self.frontier, (self.priority(node), next(self.counter), node)
+        )
+        self.states[node.state] = self.states.get(node.state, 0) + 1
+
+    def contains_state(self, state):
+        return state in self.states
+
+    def empty(self):
+        return len(self.frontier) == 0
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = heapq.heappop(self.frontier)[2]
+            self.states[node.state] -= 1
+            if self.states[node.state] == 0:
+                del self.states[node.state]
+            return node
+
+
 class Maze():
 
     def __init__(self, filename):
@@ -79,24 +174,21 @@ class Maze():
             self.walls.append(row)
 
         self.solution = None
+        self.distances = None
+        self.distances_goal = None
+        self.num_explored = 0
+        self.max_frontier = 0
+        self.explored = set()
 
 
     def print(self):
-        solution = self.solution[1] if self.solution is not None else None
+        marks = {}
+        if self.solution is not None:
+            marks.update((cell, "*") for cell in self.solution[1])
+        marks[self.start] = "A"
+        marks[self.goal] = "B"
         print()
-        for i, row in enumerate(self.walls):
-            for j, col in enumerate(row):
-                if col:
-                    print("█", end="")
-                elif (i, j) == self.start:
-                    print("A", end="")
-                elif (i, j) == self.goal:
-                    print("B", end="")
-                elif solution is not None and (i, j) in solution:
-                    print("*", end="")
-                else:
-                    print(" ", end="")
-            print()
+        print("\n".join(text_rows(self.walls, marks)))
         print()
 
 
@@ -116,19 +208,83 @@ class Maze():
         return result
 
 
-    def solve(self):
-        """Finds a solution to maze, if one exists."""
+    def heuristic(self, state):
+        """Manhattan distance from state to the goal."""
+        return abs(state[0] - self.goal[0]) + abs(state[1] - self.goal[1])
 
-        # Keep track of number of states explored
+
+    def solve(self, strategy="dfs"):
+        """
+        Finds a solution to maze, if one exists, using one of STRATEGIES.
+        Records the number of states explored, the peak frontier size
+        and the time taken.
+        """
+        if strategy not in STRATEGIES:
+            raise ValueError(f"unknown strategy {strategy}")
+
+        # Keep track of number of states explored and largest frontier
         self.num_explored = 0
+        self.max_frontier = 0
+        self.explored = set()
+
+        started = time.perf_counter()
+        try:
+            if strategy == "field":
+                self.solution = self.path_from(self.start)
+            elif strategy == "jps":
+                self.solution = self.trace_jumps(self.search(
+                    PriorityFrontier(lambda node: node.cost + self.heuristic(node.state)),
+                    reopen=True, successors=self.jump_successors
+                ))
+            elif strategy == "idastar":
+                self.solution = self.trace(self.iterative_deepening())
+            elif strategy == "dfs":
+                self.solution = self.trace(self.search(DequeStackFrontier()))
+            elif strategy == "bfs":
+                self.solution = self.trace(self.search(DequeQueueFrontier()))
+            elif strategy == "greedy":
+                self.solution = self.trace(self.search(
+                    PriorityFrontier(lambda node: self.heuristic(node.state))
+                ))
+            else:
+                self.solution = self.trace(self.search(
+                    PriorityFrontier(lambda node: node.cost + self.heuristic(node.state)),
+                    reopen=True
+                ))
+        finally:
+            self.solve_time = time.perf_counter() - started
+
+
+    def trace(self, node):
+        """Follows parent nodes back from node to find solution."""
+        actions = []
+        cells = []
+        while node.parent is not None:
+            actions.append(node.action)
+            cells.append(node.state)
+            node = node.parent
+        actions.reverse()
+        cells.reverse()
+        return (actions, cells)
+
+
+    def search(self, frontier, reopen=False, successors=None):
+        """
+        Searches from the start with the given frontier and returns the
+        goal node. With reopen, a state already in the frontier is added
+        again when reached by a cheaper path (needed for A* to find
+        shortest paths); the stale entry is skipped when removed.
+
+        successors(node) gives the (action, state, step cost) moves out
+        of a node, by default one step to each neighbor.
+        """
+        if successors is None:
+            successors = self.step_successors
 
         # Initialize frontier to just the starting position
         start = Node(state=self.start, parent=None, action=None)
-        frontier = StackFrontier()
         frontier.add(start)
-
-        # Initialize an empty explored set
-        self.explored = set()
+        best_cost = {self.start: 0}
 
         # Keep looping until solution found
         while True:
@@ -138,92 +294,258 @@ class Maze():
                 raise Exception("no solution")
 
             # Choose a node from the frontier
+            self.max_frontier = max(self.max_frontier, len(frontier.frontier))
             node = frontier.remove()
+            if node.state in self.explored:
+                continue
             self.num_explored += 1
 
             # If node is the goal, then we have a solution
             if node.state == self.goal:
-                actions = []
-                cells = []
-                while node.parent is not None:
-                    actions.append(node.action)
-                    cells.append(node.state)
-                    node = node.parent
-                actions.reverse()
-                cells.reverse()
-                self.solution = (actions, cells)
-                return
+                return node
 
             # Mark node as explored
             self.explored.add(node.state)
 
             # Add neighbors to frontier
-            for action, state in self.neighbors(node.state):
-                if not frontier.contains_state(state) and state not in self.explored:
-                    child = Node(state=state, parent=node, action=action)
-                    frontier.add(child)
-
-
-    def output_image(self, filename, show_solution=True, show_explored=False):
-        from PIL import Image, ImageDraw
-        cell_size = 50
-        cell_border = 2
-
-        # Create a blank canvas
-        img = Image.new(
-            "RGBA",
-            (self.width * cell_size, self.height * cell_size),
-            "black"
-        )
-        draw = ImageDraw.Draw(img)
-
-        solution = self.solution[1] if self.solution is not None else None
-        for i, row in enumerate(self.walls):
-            for j, col in enumerate(row):
-
-                # Walls
-                if col:
-                    fill = (40, 40, 40)
-
-                # Start
-                elif (i, j) == self.start:
-                    fill = (255, 0, 0)
+            for action, state, step in successors(node):
+                if state in self.explored:
+                    continue
+                cost = node.cost + step
+                if reopen:
+                    if state in best_cost and best_cost[state] <= cost:
+                        continue
+                    best_cost[state] = cost
+                elif frontier.contains_state(state):
+                    continue
+                child = Node(state=state, parent=node, action=action, cost=cost)
+                frontier.add(child)
+
+
+    def step_successors(self, node):
+        """Yields a one-step move to each neighbor of node."""
+        for action, state in self.neighbors(node.state):
+            yield action, state, 1
+
+
+    def open(self, row, col):
+        """Returns True if (row, col) is inside the maze and not a wall."""
+        return 0 <= row < self.height and 0 <= col < self.width and not self.walls[row][col]
+
+
+    def jump(self, row, col, dr, dc):
+        """
+        Moves from (row, col) in direction (dr, dc) for as long as no
+        shortest path can branch off, and returns the cell where one
+        can (the jump point), or None on hitting a wall.
+
+        A horizontal move stops at a forced neighbor: an open cell above
+        or below whose neighbor behind it is a wall. A vertical move also
+        stops wherever a horizontal move from it would find a jump point.
+        """
+        while True:
+            row += dr
+            col += dc
+            if not self.open(row, col):
+                return None
+            if (row, col) == self.goal:
+                return (row, col)
+            if dc != 0:
+                if ((self.open(row - 1, col) and not self.open(row - 1, col - dc))
+                        or (self.open(row + 1, col) and not self.open(row + 1, col - dc))):
+                    return (row, col)
+            else:
+                if ((self.open(row, col - 1) and not self.open(row - dr, col - 1))
+                        or (self.open(row, col + 1) and not self.open(row - dr, col + 1))):
+                    return (row, col)
+                if self.jump(row, col, 0, 1) or self.jump(row, col, 0, -1):
+                    return (row, col)
+
+
+    def jump_successors(self, node):
+        """
+        Yields moves from node to the jump points in each direction a
+        shortest path may continue: all four from the start, otherwise
+        straight on plus the two perpendicular directions.
+        """
+        row, col = node.state
+        if node.parent is None:
+            directions = list(DIRECTIONS)
+        else:
+            dr = (row > node.parent.state[0]) - (row < node.parent.state[0])
+            dc = (col > node.parent.state[1]) - (col < node.parent.state[1])
+            if dc != 0:
+                directions = [(-1, 0), (1, 0), (0, dc)]
+            else:
+                directions = [(0, -1), (0, 1), (dr, 0)]
+
+        for dr, dc in directions:
+            point = self.jump(row, col, dr, dc)
+            if point is not None:
+                yield DIRECTIONS[(dr, dc)], point, abs(point[0] - row) + abs(point[1] - col)
+
+
+    def trace_jumps(self, node):
+        """
+        Follows parent nodes back from a jump point search goal node,
+        filling in the straight runs of cells between jump points.
+        """
+        points = []
+        while node is not None:
+            points.append(node.state)
+            node = node.parent
+        points.reverse()
+
+        actions = []
+        cells = []
+        for (row, col), (to_row, to_col) in zip(points, points[1:]):
+            dr = (to_row > row) - (to_row < row)
+            dc = (to_col > col) - (to_col < col)
+            while (row, col) != (to_row, to_col):
+                row += dr
+                col += dc
+                actions.append(DIRECTIONS[(dr, dc)])
+                cells.append((row, col))
+        return (actions, cells)
+
+
+    def distance_field(self):
+        """
+        Runs a breadth-first search backwards from the goal and stores
+        in self.distances the number of steps from every cell to the
+        goal, or -1 where the goal cannot be reached, and in
+        self.distances_goal the goal it was built for. Once built, a
+        shortest path from any start is found by path_from without
+        searching.
+        """
+        self.distances_goal = self.goal
+        self.distances = [[-1] * self.width for _ in range(self.height)]
+        self.distances[self.goal[0]][self.goal[1]] = 0
+        frontier = deque([self.goal])
+        while frontier:
+            self.max_frontier = max(self.max_frontier, len(frontier))
+            state = frontier.popleft()
+            self.num_explored += 1
+            self.explored.add(state)
+            distance = self.distances[state[0]][state[1]] + 1
+            for _, (r, c) in self.neighbors(state):
+                if self.distances[r][c] == -1:
+                    self.distances[r][c] = distance
+                    frontier.append((r, c))
+
+
+    def path_from(self, start):
+        """
+        Returns the (actions, cells) of a shortest path from start to the
+        goal in time proportional to its length, by always stepping to a
+        neighbor one step closer in the distance field (built first if
+        missing or built for another goal).
+        """
+        if self.distances is None or self.distances_goal != self.goal:
+            self.distance_field()
+        if self.distances[start[0]][start[1]] == -1:
+            raise Exception("no solution")
+
+        actions = []
+        cells = []
+        state = start
+        while state != self.goal:
+            closer = self.distances[state[0]][state[1]] - 1
+            for action, (r, c) in self.neighbors(state):
+                if self.distances[r][c] == closer:
+                    break
+            else:
+                raise Exception("distance field does not lead to the goal")
+            state = (r, c)
+            actions.append(action)
+            cells.append(state)
+        return (actions, cells)
+
+
+    def iterative_deepening(self):
+        """
+        Iterative deepening A* (IDA*): repeated depth-first searches
+        that only follow paths whose cost plus heuristic stays within a
+        bound, raising the bound to the smallest value that exceeded it
+        after each pass. Uses memory proportional to the path length.
+        """
+        start = Node(state=self.start, parent=None, action=None)
+        bound = self.heuristic(self.start)
 
-                # Goal
-                elif (i, j) == self.goal:
-                    fill = (0, 171, 28)
+        while True:
+            # Each stack entry is a node on the current path and the
+            # iterator over its remaining neighbors
+            stack = [(start, iter(self.neighbors(start.state)))]
+            on_path = {start.state}
+            self.num_explored += 1
+            self.explored.add(start.state)
+            exceeded = math.inf
+
+            while stack:
+                self.max_frontier = max(self.max_frontier, len(stack))
+                node, children = stack[-1]
+                if node.state == self.goal:
+                    return node
+
+                for action, state in children:
+                    if state in on_path:
+                        continue
+                    cost = node.cost + 1
+                    estimate = cost + self.heuristic(state)
+                    if estimate > bound:
+                        exceeded = min(exceeded, estimate)
+                        continue
+                    child = Node(state=state, parent=node, action=action, cost=cost)
+                    stack.append((child, iter(self.neighbors(state))))
+                    on_path.add(state)
+                    self.num_explored += 1
+                    self.explored.add(state)
+                    break
+                else:
+                    stack.pop()
+                    on_path.discard(node.state)
 
-                # Solution
-                elif solution is not None and show_solution and (i, j) in solution:
-                    fill = (220, 235, 113)
+            # Nothing was cut off by the bound, so there is no path
+            if exceeded == math.inf:
+                raise Exception("no solution")
+            bound = exceeded
 
-                # Explored
-                elif solution is not None and show_explored and (i, j) in self.explored:
-                    fill = (212, 97, 85)
 
-                # Empty cell
-                else:
-                    fill = (237, 240, 252)
-
-                # Draw cell
-                draw.rectangle(
-                    ([(j * cell_size + cell_border, i * cell_size + cell_border),
-                      ((j + 1) * cell_size - cell_border, (i + 1) * cell_size - cell_border)]),
-                    fill=fill
-                )
-
-        img.save(filename)
-
-
-if len(sys.argv) != 2:
-    sys.exit("Usage: python maze.py maze.txt")
-
-m = Maze(sys.argv[1])
-print("Maze:")
-m.print()
-print("Solving...")
-m.solve()
-print("States Explored:", m.num_explored)
-print("Solution:")
-m.print()
-m.output_image("maze.png", show_explored=True)
+    def output_image(self, filename, show_solution=True, show_explored=False,
+                     cell_size=None, cell_border=None):
+        solution = self.solution[1] if self.solution is not None else None
+        kinds = cell_kinds(
+            self.walls, self.start, self.goal,
+            solution=solution if solution is not None and show_solution else (),
+            explored=self.explored if solution is not None and show_explored else ()
+        )
+        save_image(filename, kinds, self.width, self.height, cell_size, cell_border)
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if arg != "--grid"]
+    grid = len(args) != len(sys.argv) - 1
+    strategies = GRID_STRATEGIES if grid else STRATEGIES
+    if len(args) not in [1, 2] or (len(args) == 2 and args[1] not in strategies):
+        sys.exit(f"Usage: python maze.py maze.txt [{'|'.join(STRATEGIES)}]\n"
+                 f"       python maze.py --grid maze.txt [{'|'.join(GRID_STRATEGIES)}]")
+    strategy = args[1] if len(args) == 2 else strategies[0]
+
+    m = GridMaze(args[0]) if grid else Maze(args[0])
+    print("Maze:")
+    m.print()
+    print(f"Solving with {strategy}...")
+    m.solve(strategy)
+    print("States Explored:", m.num_explored)
+    print("Peak Frontier:", m.max_frontier)
+    print(f"Time: {m.solve_time * 1000:.2f} ms")
+    print("Solution:")
+    m.print()
+    if grid:
+        m.output_image("maze.png")
+    else:
+        m.output_image("maze.png", show_explored=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# Palette index of each kind of cell in the images saved by save_image
+EMPTY, WALL, START, GOAL, SOLUTION, EXPLORED, BORDER = range(7)
+
+PALETTE = [
+    (237, 240, 252),
+    (40, 40, 40),
+    (255, 0, 0),
+    (0, 171, 28),
+    (220, 235, 113),
+    (212, 97, 85),
+    (0, 0, 0)
+]
+
+# Maps wall bytes (0 or 1) to the characters printed for them
+TEXT = {0: " ", 1: "█"}
+
+
+def text_rows(rows, marks):
+    """
+    Returns the printed form of a maze as one string per row.
+
+    rows are the wall bytes of each row and marks maps (i, j)
+    positions to characters drawn over them, such as "A" or "*".
+    """
+    lines = [list(bytes(row).decode("latin-1").translate(TEXT)) for row in rows]
+    for (i, j), mark in marks.items():
+        lines[i][j] = mark
+    return ["".join(line) for line in lines]
+
+
+def cell_kinds(rows, start, goal, solution=(), explored=()):
+    """
+    Returns a bytearray with the palette index of every cell, row by
+    row, given the wall bytes of each row and the cells to highlight.
+    """
+    width = len(rows[0]) if rows else 0
+    kinds = bytearray().join(bytes(row) for row in rows)
+    for i, j in explored:
+        kinds[i * width + j] = EXPLORED
+    for i, j in solution:
+        kinds[i * width + j] = SOLUTION
+    kinds[start[0] * width + start[1]] = START
+    kinds[goal[0] * width + goal[1]] = GOAL
+    return kinds
+
+
+def save_image(filename, kinds, width, height, cell_size=None, cell_border=None):
+    """
+    Saves a maze image from the palette index of every cell.
+
+    The image is built at one pixel per cell and scaled up with
+    nearest-neighbor resampling, then the gaps between cells are drawn
+    as one stripe per row and column rather than one rectangle per cell.
+    By default cells are 50px, shrunk so large mazes stay about 2000px
+    across, with a border of 1/25 of a cell.
+    """
+    from PIL import Image, ImageDraw
+
+    if cell_size is None:
+        cell_size = max(1, min(50, 2000 // max(width, height)))
+    if cell_border is None:
+        cell_border = cell_size // 25
+
+    img = Image.frombytes("P", (width, height), bytes(kinds))
+    img.putpalette([channel for color in PALETTE for channel in color])
+    img = img.resize((width * cell_size, height * cell_size), Image.NEAREST)
+
+    if cell_border:
+        draw = ImageDraw.Draw(img)
+        for j in range(width + 1):
+            x = j * cell_size
+            draw.rectangle([(x - cell_border + 1, 0), (x + cell_border - 1, img.height)],
+                           fill=BORDER)
+        for i in range(height + 1):
+            y = i * cell_size
+            draw.rectangle([(0, y - cell_border + 1), (img.width, y + cell_border - 1)],
+                           fill=BORDER)
+
+    img.save(filename)
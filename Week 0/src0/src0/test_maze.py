@@ -0,0 +1,84 @@
+import os
+import random
+import tempfile
+import unittest
+
+from generate import GENERATORS, generate, write_maze
+from maze import Maze
+
+# Strategies that must find a path as short as breadth-first search does
+SHORTEST = ["astar", "idastar", "jps", "field"]
+
+
+def load(generator, height, width, seed):
+    """Returns a Maze built by generate, via a temporary file."""
+    fd, filename = tempfile.mkstemp(suffix=".txt")
+    os.close(fd)
+    try:
+        write_maze(filename, generate(generator, height, width, seed))
+        return Maze(filename)
+    finally:
+        os.remove(filename)
+
+
+def reachable(maze, cell):
+    """Returns the set of open cells reachable from cell."""
+    seen = {cell}
+    stack = [cell]
+    while stack:
+        for _, neighbor in maze.neighbors(stack.pop()):
+            if neighbor not in seen:
+                seen.add(neighbor)
+                stack.append(neighbor)
+    return seen
+
+
+class TestShortestPaths(unittest.TestCase):
+
+    def assert_walk(self, maze):
+        """Checks the solution steps through open cells to the goal."""
+        actions, cells = maze.solution
+        self.assertEqual(len(actions), len(cells))
+        previous = maze.start
+        for cell in cells:
+            self.assertEqual(abs(cell[0] - previous[0]) + abs(cell[1] - previous[1]), 1)
+            self.assertFalse(maze.walls[cell[0]][cell[1]])
+            previous = cell
+        self.assertEqual(previous, maze.goal)
+
+    def assert_same_length(self, maze, strategies):
+        maze.solve("bfs")
+        expected = len(maze.solution[0])
+        for strategy in strategies:
+            with self.subTest(start=maze.start, goal=maze.goal, strategy=strategy):
+                maze.solve(strategy)
+                self.assert_walk(maze)
+                self.assertEqual(len(maze.solution[0]), expected)
+
+    def test_random_start_and_goal(self):
+        rng = random.Random(0)
+        for generator in GENERATORS:
+            for seed in range(5):
+                maze = load(generator, 15, 21, seed)
+                cells = sorted(reachable(maze, maze.start))
+                for _ in range(3):
+                    maze.start, maze.goal = rng.sample(cells, 2)
+                    # IDA* repeats its search at every bound, keep it to short paths
+                    strategies = SHORTEST
+                    if maze.heuristic(maze.start) > 12:
+                        strategies = [s for s in SHORTEST if s != "idastar"]
+                    self.assert_same_length(maze, strategies)
+
+    def test_goal_changes(self):
+        rng = random.Random(1)
+        for generator in GENERATORS:
+            maze = load(generator, 21, 21, 7)
+            cells = sorted(reachable(maze, maze.start))
+            for _ in range(5):
+                # The distance field built for the previous goal is stale
+                maze.goal = rng.choice([cell for cell in cells if cell != maze.start])
+                self.assert_same_length(maze, ["field", "jps", "astar"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+"""
+Builds and checks the tic-tac-toe opening book loaded by tictactoe.py
+
+Usage: python book.py build|verify
+"""
+
+import math
+import sys
+from array import array
+
+import tictactoe as ttt
+from tictactoe import BOOK_MAGIC, BOOK_PATH, BOOK_PREAMBLE, BOOK_VERSION
+
+
+def reachable():
+    """
+    Returns the (x, o) masks of every unfinished board that can come up
+    in a game from the initial state.
+    """
+    start = ttt.to_bits(ttt.initial_state())
+    seen = {start}
+    stack = [start]
+    boards = []
+    while stack:
+        x, o = stack.pop()
+        if ttt.bits_winner(x, o) is not None or x | o == ttt.FULL:
+            continue
+        boards.append((x, o))
+        x_to_move = ttt.POPCOUNT[x] <= ttt.POPCOUNT[o]
+        for move in ttt.bits_moves(x, o):
+            child = (x | 1 << move, o) if x_to_move else (x, o | 1 << move)
+            if child not in seen:
+                seen.add(child)
+                stack.append(child)
+    return boards
+
+
+def build_book():
+    """
+    Returns a dict from the key of every reachable unfinished board to
+    the cell of the move tictactoe.search picks for it.
+    """
+    book = {}
+    for x, o in reachable():
+        i, j = ttt.search(ttt.from_bits(x, o))
+        book[x | o << 9] = 3 * i + j
+    return book
+
+
+def write_book(book, path=BOOK_PATH):
+    """Writes book to path in the layout read by tictactoe.load_book."""
+    entries = array("I", sorted(key << 4 | move for key, move in book.items()))
+    if sys.byteorder == "big":
+        entries.byteswap()
+    with open(path, "wb") as f:
+        f.write(BOOK_PREAMBLE.pack(BOOK_MAGIC, BOOK_VERSION, len(entries)))
+        entries.tofile(f)
+
+
+def value(x, o):
+    """Returns the exact minimax value of the (x, o) board."""
+    if ttt.POPCOUNT[x] <= ttt.POPCOUNT[o]:
+        return ttt.bits_max_value(x, o, -math.inf, math.inf)
+    return ttt.bits_min_value(x, o, -math.inf, math.inf)
+
+
+def verify(book):
+    """
+    Checks book against search on every reachable unfinished board:
+    the book must have the board, its move must be legal, and the move
+    must lead to the same minimax value as the move search picks.
+    Returns the number of boards checked.
+    """
+    boards = reachable()
+    for x, o in boards:
+        board = ttt.from_bits(x, o)
+        move = book.get(x | o << 9)
+        if move is None:
+            raise Exception(f"book is missing board {board}")
+        if (x | o) >> move & 1:
+            raise Exception(f"book plays on a taken cell of board {board}")
+        expected = ttt.to_bits(ttt.result(board, ttt.search(board)))
+        actual = ttt.to_bits(ttt.result(board, divmod(move, 3)))
+        if value(*actual) != value(*expected):
+            raise Exception(f"book move {divmod(move, 3)} is not optimal on board {board}")
+    return len(boards)
+
+
+def main():
+    if len(sys.argv) != 2 or sys.argv[1] not in ["build", "verify"]:
+        sys.exit("Usage: python book.py build|verify")
+
+    if sys.argv[1] == "build":
+        book = build_book()
+        write_book(book)
+        print(f"Wrote {len(book)} positions to {BOOK_PATH}")
+    else:
+        book = ttt.load_book()
+        if not book:
+            sys.exit(f"No opening book at {BOOK_PATH}; run python book.py build")
+        print(f"Verified {verify(book)} positions")
+
+
+if __name__ == "__main__":
+    main()
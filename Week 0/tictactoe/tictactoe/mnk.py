@@ -0,0 +1,301 @@
+"""
+m,n,k-game Player: tic-tac-toe on a board of any height and width,
+won by the first player with k marks in a row
+"""
+
+import math
+import time
+from functools import lru_cache
+
+import tictactoe as ttt
+from tictactoe import X, O, EMPTY
+
+# Seconds the AI may spend on a move by default
+TIME_LIMIT = 1.0
+
+# Score of a won game; wins found sooner score slightly higher
+WIN = 10 ** 9
+
+# Statistics of the most recent minimax call: nodes searched, deepest
+# completed depth and seconds taken
+last_search = {"nodes": 0, "depth": 0, "seconds": 0.0}
+
+
+class Timeout(Exception):
+    pass
+
+
+class Engine():
+    """
+    Precomputed masks for one board shape.
+
+    A board is a pair of integers used as bitboards, one per player,
+    with cell (i, j) at bit i * stride + j. Each row has one spare bit
+    past its last column, so shifting a line of marks can never wrap
+    from one row into the next.
+    """
+
+    def __init__(self, height, width, k):
+        self.height = height
+        self.width = width
+        self.k = k
+        self.stride = width + 1
+        self.cells = [i * self.stride + j for i in range(height) for j in range(width)]
+        self.full = sum(1 << cell for cell in self.cells)
+
+        # Right, down, down-right and down-left
+        self.directions = [1, self.stride, self.stride + 1, self.stride - 1]
+
+        # Every run of k cells where a player could still win
+        self.windows = []
+        for i in range(height):
+            for j in range(width):
+                for di, dj in [(0, 1), (1, 0), (1, 1), (1, -1)]:
+                    end_i, end_j = i + di * (k - 1), j + dj * (k - 1)
+                    if 0 <= end_i < height and 0 <= end_j < width:
+                        self.windows.append(sum(
+                            1 << ((i + di * s) * self.stride + j + dj * s)
+                            for s in range(k)
+                        ))
+
+        # Score of a window holding count marks of one player only
+        self.scores = [0] + [10 ** count for count in range(1, k + 1)]
+
+    def wins(self, bits):
+        """Returns True if bits holds k marks in a row."""
+        for direction in self.directions:
+            line = bits
+            for _ in range(self.k - 1):
+                line &= line >> direction
+            if line:
+                return True
+        return False
+
+    def evaluate(self, me, them):
+        """
+        Heuristic value of a position for the player holding me, who is
+        to move: every window still open to one player counts for that
+        player, much more so the more of it they have filled. A window
+        one mark short for me is a win on this move.
+        """
+        scores = self.scores
+        total = 0
+        for window in self.windows:
+            mine = me & window
+            theirs = them & window
+            if mine and not theirs:
+                count = bin(mine).count("1")
+                if count == self.k - 1:
+                    return WIN // 2
+                total += scores[count]
+            elif theirs and not mine:
+                total -= scores[bin(theirs).count("1")]
+        return total
+
+    def candidates(self, me, them):
+        """
+        Returns the empty cells worth trying: on boards of up to 16
+        cells all of them, otherwise those next to a mark, or the
+        center of an empty board.
+        """
+        occupied = me | them
+        if len(self.cells) <= 16:
+            return [cell for cell in self.cells if not occupied >> cell & 1]
+        if not occupied:
+            return [(self.height // 2) * self.stride + self.width // 2]
+        near = 0
+        for direction in self.directions:
+            near |= occupied << direction | occupied >> direction
+        near &= self.full & ~occupied
+        return [cell for cell in self.cells if near >> cell & 1]
+
+    def ordered_moves(self, me, them, first=None):
+        """
+        Returns candidate moves, best first by the heuristic value
+        after making them, with first (if given) ahead of all.
+        """
+        moves = sorted(
+            self.candidates(me, them),
+            key=lambda cell: self.evaluate(them, me | 1 << cell)
+        )
+        if first in moves:
+            moves.remove(first)
+            moves.insert(0, first)
+        return moves
+
+    def negamax(self, me, them, depth, alpha, beta, ply, deadline, cancel=None):
+        """
+        Returns the value of the position for the player to move, who
+        holds me, searching depth more moves with alpha-beta pruning.
+        Raises Timeout once past deadline or once cancel (a
+        threading.Event, if given) is set.
+        """
+        last_search["nodes"] += 1
+        if time.perf_counter() > deadline or (cancel is not None and cancel.is_set()):
+            raise Timeout
+
+        if self.wins(them):
+            return -(WIN - ply)
+        if (me | them) == self.full:
+            return 0
+        if depth == 0:
+            return self.evaluate(me, them)
+
+        value = -math.inf
+        for cell in self.ordered_moves(me, them):
+            value = max(value, -self.negamax(
+                them, me | 1 << cell, depth - 1, -beta, -alpha, ply + 1, deadline, cancel
+            ))
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                break
+        return value
+
+    def best_move(self, me, them, time_limit, cancel=None):
+        """
+        Returns the best cell for the player holding me found by
+        iterative deepening: searching one move deeper each pass, for
+        as long as time_limit allows and cancel is not set, and keeping
+        the result of the last pass to finish.
+        """
+        started = time.perf_counter()
+        deadline = started + time_limit
+        remaining = len(self.cells) - bin(me | them).count("1")
+
+        moves = self.ordered_moves(me, them)
+        best = moves[0]
+        for depth in range(1, remaining + 1):
+            try:
+                alpha = -math.inf
+                depth_best = None
+                for cell in self.ordered_moves(me, them, first=best):
+                    value = -self.negamax(
+                        them, me | 1 << cell, depth - 1, -math.inf, -alpha, 1, deadline, cancel
+                    )
+                    if value > alpha:
+                        alpha = value
+                        depth_best = cell
+            except Timeout:
+                break
+            best = depth_best
+            last_search["depth"] = depth
+
+            # Stop once a win or loss is certain
+            if abs(alpha) >= WIN - len(self.cells):
+                break
+
+        last_search["seconds"] = time.perf_counter() - started
+        return best
+
+
+@lru_cache(maxsize=None)
+def engine(height, width, k):
+    """Returns the Engine for a board shape, built once per shape."""
+    return Engine(height, width, k)
+
+
+def to_bits(board, game):
+    """Returns the (x, o) bitboards of a board."""
+    x = 0
+    o = 0
+    for i, row in enumerate(board):
+        for j, cell in enumerate(row):
+            if cell == X:
+                x |= 1 << (i * game.stride + j)
+            elif cell == O:
+                o |= 1 << (i * game.stride + j)
+    return x, o
+
+
+def initial_state(height=3, width=3):
+    """
+    Returns starting state of a board of the given size.
+    """
+    return [[EMPTY] * width for _ in range(height)]
+
+
+def player(board):
+    """
+    Returns player who has the next turn on a board.
+    """
+    number_of_Xs = sum(row.count(X) for row in board)
+    number_of_Os = sum(row.count(O) for row in board)
+    return X if number_of_Xs <= number_of_Os else O
+
+
+def actions(board):
+    """
+    Returns set of all possible actions (i, j) available on the board.
+    """
+    return {
+        (i, j)
+        for i, row in enumerate(board)
+        for j, cell in enumerate(row)
+        if cell == EMPTY
+    }
+
+
+def result(board, action):
+    """
+    Returns the board that results from making move (i, j) on the board.
+    """
+    copy_board = [row[:] for row in board]
+    copy_board[action[0]][action[1]] = player(board)
+    return copy_board
+
+
+def winner(board, k=3):
+    """
+    Returns the winner of the game, if there is one.
+    """
+    game = engine(len(board), len(board[0]), k)
+    x, o = to_bits(board, game)
+    if game.wins(x):
+        return X
+    if game.wins(o):
+        return O
+    return None
+
+
+def terminal(board, k=3):
+    """
+    Returns True if game is over, False otherwise.
+    """
+    return winner(board, k) is not None or not actions(board)
+
+
+def utility(board, k=3):
+    """
+    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    """
+    won = winner(board, k)
+    if won == X:
+        return 1
+    if won == O:
+        return -1
+    return 0
+
+
+def minimax(board, k=3, time_limit=TIME_LIMIT, cancel=None):
+    """
+    Returns the best action found for the current player on the board
+    within about time_limit seconds. Setting cancel, a threading.Event,
+    from another thread ends the search early with the best action
+    found so far.
+
+    Classic 3x3 tic-tac-toe is solved exactly by tictactoe.minimax.
+    """
+    if terminal(board, k):
+        return None
+
+    last_search.update(nodes=0, depth=0, seconds=0.0)
+    if len(board) == 3 and len(board[0]) == 3 and k == 3:
+        return ttt.minimax(board)
+
+    game = engine(len(board), len(board[0]), k)
+    x, o = to_bits(board, game)
+    if player(board) == X:
+        cell = game.best_move(x, o, time_limit, cancel)
+    else:
+        cell = game.best_move(o, x, time_limit, cancel)
+    return divmod(cell, game.stride)
@@ -1,9 +1,27 @@
 import pygame
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 
+import mnk
 import tictactoe as ttt
 
+# Board variants offered on the title screen: (name, height, width, k)
+VARIANTS = [
+    ("3x3", 3, 3, 3),
+    ("4x4", 4, 4, 4),
+    ("Gomoku 9x9", 9, 9, 5)
+]
+
+# Seconds the AI may think per move, from the command line if given
+if len(sys.argv) > 2:
+    sys.exit("Usage: python runner.py [seconds]")
+time_limit = float(sys.argv[1]) if len(sys.argv) == 2 else mnk.TIME_LIMIT
+
+# Seconds the AI waits at least before moving, so its moves can be followed
+AI_DELAY = 0.5
+
 pygame.init()
 size = width, height = 600, 400
 
@@ -18,13 +36,23 @@ largeFont = pygame.font.Font("OpenSans-Regular.ttf", 40)
 moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
 
 user = None
-board = ttt.initial_state()
-ai_turn = False
+variant = 0
+name, rows, cols, k = VARIANTS[variant]
+board = mnk.initial_state(rows, cols)
+
+# The AI searches on a worker thread so the window keeps responding:
+# search is the future of its move, cancel the event that stops it early
+executor = ThreadPoolExecutor(max_workers=1)
+search = None
+cancel = None
+search_started = None
 
 while True:
 
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
+            if cancel is not None:
+                cancel.set()
             sys.exit()
 
     screen.fill(black)
@@ -38,6 +66,14 @@ while True:
         titleRect.center = ((width / 2), 50)
         screen.blit(title, titleRect)
 
+        # Draw board choice
+        variantButton = pygame.Rect(width / 4, (height / 2) - 80, width / 2, 50)
+        variantText = mediumFont.render(f"Board: {name}", True, black)
+        variantRect = variantText.get_rect()
+        variantRect.center = variantButton.center
+        pygame.draw.rect(screen, white, variantButton)
+        screen.blit(variantText, variantRect)
+
         # Draw buttons
         playXButton = pygame.Rect((width / 8), (height / 2), width / 4, 50)
         playX = mediumFont.render("Play as X", True, black)
@@ -57,7 +93,12 @@ while True:
         click, _, _ = pygame.mouse.get_pressed()
         if click == 1:
             mouse = pygame.mouse.get_pos()
-            if playXButton.collidepoint(mouse):
+            if variantButton.collidepoint(mouse):
+                time.sleep(0.2)
+                variant = (variant + 1) % len(VARIANTS)
+                name, rows, cols, k = VARIANTS[variant]
+                board = mnk.initial_state(rows, cols)
+            elif playXButton.collidepoint(mouse):
                 time.sleep(0.2)
                 user = ttt.X
             elif playOButton.collidepoint(mouse):
@@ -66,14 +107,16 @@ while True:
 
     else:
 
-        # Draw game board
-        tile_size = 80
-        tile_origin = (width / 2 - (1.5 * tile_size),
-                       height / 2 - (1.5 * tile_size))
+        # Draw game board, with tiles shrunk to fit larger boards
+        tile_size = min(80, (height - 120) // rows, (width - 40) // cols)
+        if moveFont.get_height() > tile_size:
+            moveFont = pygame.font.Font("OpenSans-Regular.ttf", tile_size * 3 // 4)
+        tile_origin = (width / 2 - (cols / 2 * tile_size),
+                       height / 2 - (rows / 2 * tile_size))
         tiles = []
-        for i in range(3):
+        for i in range(rows):
             row = []
-            for j in range(3):
+            for j in range(cols):
                 rect = pygame.Rect(
                     tile_origin[0] + j * tile_size,
                     tile_origin[1] + i * tile_size,
@@ -89,12 +132,12 @@ while True:
                 row.append(rect)
             tiles.append(row)
 
-        game_over = ttt.terminal(board)
-        player = ttt.player(board)
+        game_over = mnk.terminal(board, k)
+        player = mnk.player(board)
 
         # Show title
         if game_over:
-            winner = ttt.winner(board)
+            winner = mnk.winner(board, k)
             if winner is None:
                 title = f"Game Over: Tie."
             else:
@@ -102,45 +145,53 @@ while True:
         elif user == player:
             title = f"Play as {user}"
         else:
-            title = f"Computer thinking..."
+            dots = int(time.time() * 2) % 4
+            title = f"Computer thinking{'.' * dots:<3}"
         title = largeFont.render(title, True, white)
         titleRect = title.get_rect()
         titleRect.center = ((width / 2), 30)
         screen.blit(title, titleRect)
 
-        # Check for AI move
+        # Start the AI search, or make its move once found
         if user != player and not game_over:
-            if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
-                board = ttt.result(board, move)
-                ai_turn = False
-            else:
-                ai_turn = True
+            if search is None:
+                cancel = threading.Event()
+                search = executor.submit(mnk.minimax, board, k, time_limit, cancel)
+                search_started = time.time()
+            elif search.done() and time.time() - search_started >= AI_DELAY:
+                board = mnk.result(board, search.result())
+                search = None
 
         # Check for a user move
         click, _, _ = pygame.mouse.get_pressed()
         if click == 1 and user == player and not game_over:
             mouse = pygame.mouse.get_pos()
-            for i in range(3):
-                for j in range(3):
+            for i in range(rows):
+                for j in range(cols):
                     if (board[i][j] == ttt.EMPTY and tiles[i][j].collidepoint(mouse)):
-                        board = ttt.result(board, (i, j))
+                        board = mnk.result(board, (i, j))
 
+        # Offer a new game, at any time, cancelling any AI search
         if game_over:
             againButton = pygame.Rect(width / 3, height - 65, width / 3, 50)
             again = mediumFont.render("Play Again", True, black)
-            againRect = again.get_rect()
-            againRect.center = againButton.center
-            pygame.draw.rect(screen, white, againButton)
-            screen.blit(again, againRect)
-            click, _, _ = pygame.mouse.get_pressed()
-            if click == 1:
-                mouse = pygame.mouse.get_pos()
-                if againButton.collidepoint(mouse):
-                    time.sleep(0.2)
-                    user = None
-                    board = ttt.initial_state()
-                    ai_turn = False
+        else:
+            againButton = pygame.Rect(width - 110, height - 50, 100, 40)
+            again = mediumFont.render("Reset", True, black)
+        againRect = again.get_rect()
+        againRect.center = againButton.center
+        pygame.draw.rect(screen, white, againButton)
+        screen.blit(again, againRect)
+        click, _, _ = pygame.mouse.get_pressed()
+        if click == 1:
+            mouse = pygame.mouse.get_pos()
+            if againButton.collidepoint(mouse):
+                time.sleep(0.2)
+                if cancel is not None:
+                    cancel.set()
+                search = None
+                user = None
+                board = mnk.initial_state(rows, cols)
+                moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
 
     pygame.display.flip()
@@ -3,13 +3,165 @@ Tic Tac Toe Player
 """
 
 import math
-import copy
-import random
+import os
+import struct
+import sys
+from array import array
 
 X = "X"
 O = "O"
 EMPTY = None
 
+# Kinds of values stored in the transposition table: the exact minimax
+# value, or a bound on it when alpha-beta cut the search short
+EXACT = "exact"
+LOWER = "lower"
+UPPER = "upper"
+
+# Maps canonical boards to (value, kind) from earlier searches
+transposition_table = {}
+
+# Statistics of the most recent minimax call: boards searched
+last_search = {"nodes": 0}
+
+# Internally a board is a pair of 9-bit masks (x, o), one per player,
+# where bit 3 * i + j is set if that player has a mark at (i, j)
+FULL = 0b111111111
+
+# The rows, columns and diagonals, as masks
+WIN_MASKS = [
+    0b000000111, 0b000111000, 0b111000000,
+    0b001001001, 0b010010010, 0b100100100,
+    0b100010001, 0b001010100
+]
+
+# Number of set bits of every 9-bit mask
+POPCOUNT = [bin(mask).count("1") for mask in range(FULL + 1)]
+
+
+def symmetry_tables():
+    """
+    Returns, for each of the 8 symmetries of the board (rotations and
+    reflections), a table mapping every 9-bit mask to its image.
+    """
+    transforms = [
+        lambda i, j: (i, j),
+        lambda i, j: (j, 2 - i),
+        lambda i, j: (2 - i, 2 - j),
+        lambda i, j: (2 - j, i),
+        lambda i, j: (i, 2 - j),
+        lambda i, j: (2 - i, j),
+        lambda i, j: (j, i),
+        lambda i, j: (2 - j, 2 - i)
+    ]
+    tables = []
+    for transform in transforms:
+        table = []
+        for mask in range(FULL + 1):
+            image = 0
+            for cell in range(9):
+                if mask >> cell & 1:
+                    i, j = transform(*divmod(cell, 3))
+                    image |= 1 << (3 * i + j)
+            table.append(image)
+        tables.append(table)
+    return tables
+
+
+SYMMETRIES = symmetry_tables()
+
+# Opening book written by book.py: a preamble followed by one little-endian
+# uint32 per reachable unfinished board, the board's key x | o << 9
+# shifted left 4 bits and or-ed with the cell of its optimal move
+BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tictactoe.book")
+BOOK_MAGIC = b"TTTBOOK\0"
+BOOK_VERSION = 1
+
+# Magic, version, number of entries
+BOOK_PREAMBLE = struct.Struct("<8sII")
+
+
+def load_book(path=BOOK_PATH):
+    """
+    Returns the opening book at path as a dict from board keys to the
+    cell of the optimal move, or an empty dict if there is no book, in
+    which case minimax searches instead.
+    """
+    try:
+        with open(path, "rb") as f:
+            magic, version, count = BOOK_PREAMBLE.unpack(f.read(BOOK_PREAMBLE.size))
+            if magic != BOOK_MAGIC or version != BOOK_VERSION:
+                return {}
+            entries = array("I")
+            entries.frombytes(f.read())
+    except (OSError, ValueError, struct.error):
+        return {}
+    if len(entries) != count:
+        return {}
+    if sys.byteorder == "big":
+        entries.byteswap()
+    return {entry >> 4: entry & 0xF for entry in entries}
+
+
+book = load_book()
+
+
+def to_bits(board):
+    """
+    Returns the (x, o) masks of a board.
+    """
+    x = 0
+    o = 0
+    for i, row in enumerate(board):
+        for j, cell in enumerate(row):
+            if cell == X:
+                x |= 1 << (3 * i + j)
+            elif cell == O:
+                o |= 1 << (3 * i + j)
+    return x, o
+
+
+def from_bits(x, o):
+    """
+    Returns the board of a pair of (x, o) masks.
+    """
+    return [
+        [X if x >> (3 * i + j) & 1 else O if o >> (3 * i + j) & 1 else EMPTY
+         for j in range(3)]
+        for i in range(3)
+    ]
+
+
+def canonical(x, o):
+    """
+    Returns one integer shared by a board and all its rotations and
+    reflections, which have the same minimax value.
+    """
+    return min(table[x] | table[o] << 9 for table in SYMMETRIES)
+
+
+def bits_winner(x, o):
+    """
+    Returns X or O if that player has a full line, else None.
+    """
+    for mask in WIN_MASKS:
+        if x & mask == mask:
+            return X
+        if o & mask == mask:
+            return O
+    return None
+
+
+def bits_moves(x, o):
+    """
+    Yields the index 3 * i + j of each empty cell.
+    """
+    free = ~(x | o) & FULL
+    while free:
+        move = free & -free
+        yield move.bit_length() - 1
+        free ^= move
+
 
 def initial_state():
     """
@@ -24,162 +176,203 @@ def player(board):
     """
     Returns player who has the next turn on a board.
     """
-    #Starts the variables
-    number_of_Xs = 0
-    number_of_Os = 0
-
-    for row in board:
-        for line in row:
-            if line == "X":
-                number_of_Xs += 1
-            if line =="O":
-                number_of_Os += 1
+    x, o = to_bits(board)
     #If the number of Xs is equal or less than the number of Os it means it is X's turn
-    if number_of_Xs <= number_of_Os:
-        return X
-    #Else it is O's turn
-    else:
-        return O
+    return X if POPCOUNT[x] <= POPCOUNT[o] else O
 
 
 def actions(board):
     """
     Returns set of all possible actions (i, j) available on the board.
     """
-    #Starts the set of actions as empty
-    actions_set = set()
-
-    #Checks for empty spaces in the board and add a tuple of (line, colummn) to the set
-    for i, row in enumerate(board):
-        for j, value in enumerate(row):
-            if value == None:
-                actions_set.add((i, j))
-    
-    return actions_set
+    return {divmod(cell, 3) for cell in bits_moves(*to_bits(board))}
 
 
 def result(board, action):
     """
     Returns the board that results from making move (i, j) on the board.
     """
-    #Uses the deepcopy to copy the board
-    copy_board = copy.deepcopy(board)
-    #Check what player has the move
-    player_move = player(board)
-    #Line
-    i = action[0]
-    #Colummn
-    j = action[1]
+    x, o = to_bits(board)
+    move = 1 << (3 * action[0] + action[1])
     #Put a X or a O in the specified position depending in wich player has the move
-    copy_board[i][j] = player_move
-
-    return copy_board
+    if POPCOUNT[x] <= POPCOUNT[o]:
+        x |= move
+    else:
+        o |= move
+    return from_bits(x, o)
 
 
 def winner(board):
     """
     Returns the winner of the game, if there is one.
     """
-    for i in range(3):
-        if board[i][0] == board[i][1] == board[i][2]:
-            if board[i][0] == X:
-                return X
-            if board[i][0] == O:
-                return O
-    
-    for j in range(3):
-        if board[0][j] == board[1][j] == board[2][j]:
-            if board[0][j] == X:
-                return X
-            if board[0][j] == O:
-                return O
-
-    if board[0][0] == board[1][1] == board[2][2]:
-        if board[0][0] == X:
-            return X
-        if board[0][0] == O:
-            return O
-    
-    if board[2][0] == board[1][1] == board[0][2]:
-        if board[1][1] == X:
-            return X
-        if board[1][1] == O:
-            return O
-
-    return None
+    return bits_winner(*to_bits(board))
 
 
 def terminal(board):
     """
     Returns True if game is over, False otherwise.
     """
-    if winner(board) or not actions(board):
-        return True
-    else: 
-        return False
+    x, o = to_bits(board)
+    return bits_winner(x, o) is not None or x | o == FULL
 
 
 def utility(board):
     """
     Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
     """
-    if winner(board) == X:
+    return bits_utility(*to_bits(board))
+
+
+def bits_utility(x, o):
+    """
+    Returns 1 if X has a full line, -1 if O has one, 0 otherwise.
+    """
+    winner = bits_winner(x, o)
+    if winner == X:
         return 1
-    if winner(board) == O:
+    if winner == O:
         return -1
-    else:
-        return 0 
+    return 0
 
 
 def minimax(board):
     """
-    Returns the optimal action for the current player on the board.
+    Returns the optimal action for the current player on the board,
+    from the opening book when it has the board.
     """
     if terminal(board):
-        return none
-    if board == initial_state():
-        return (random.randint(0, 2), random.randint(0, 2))
+        return None
+
+    x, o = to_bits(board)
+    last_search["nodes"] = 0
+    move = book.get(x | o << 9)
+    if move is not None:
+        return divmod(move, 3)
+    return search(board)
+
 
-    if player(board) == X:
+def search(board):
+    """
+    Returns the optimal action for the current player on an unfinished
+    board found by alpha-beta search.
+    """
+    last_search["nodes"] = 0
+    x, o = to_bits(board)
+    alpha = -math.inf
+    beta = math.inf
+    best_move = None
+    if POPCOUNT[x] <= POPCOUNT[o]:
         value = -math.inf
-        best_action = None
-        for action in actions(board):
-            min_val = min_value(result(board,action))
+        for move in bits_moves(x, o):
+            min_val = bits_min_value(x | 1 << move, o, alpha, beta)
             if min_val > value:
                 value = min_val
-                best_action = action
-    if player(board) == O:
-        value = +math.inf
-        best_action = None
-        for action in actions(board):
-            max_val = max_value(result(board,action))
+                best_move = move
+            alpha = max(alpha, value)
+    else:
+        value = math.inf
+        for move in bits_moves(x, o):
+            max_val = bits_max_value(x, o | 1 << move, alpha, beta)
             if max_val < value:
                 value = max_val
-                best_action = action
-    return best_action
+                best_move = move
+            beta = min(beta, value)
+    return divmod(best_move, 3)
 
-def min_value(board):
+
+def lookup(key, alpha, beta):
+    """
+    Returns (value, alpha, beta) from the transposition table: the
+    stored value if it settles the search within (alpha, beta), else
+    None with the window narrowed by any stored bound.
+    """
+    entry = transposition_table.get(key)
+    if entry is None:
+        return None, alpha, beta
+    value, kind = entry
+    if kind == EXACT:
+        return value, alpha, beta
+    if kind == LOWER:
+        alpha = max(alpha, value)
+    else:
+        beta = min(beta, value)
+    if alpha >= beta:
+        return value, alpha, beta
+    return None, alpha, beta
+
+
+def store(key, value, alpha, beta):
+    """
+    Stores the value searched with window (alpha, beta) in the
+    transposition table, as a bound if it fell outside the window.
+    """
+    if value <= alpha:
+        kind = UPPER
+    elif value >= beta:
+        kind = LOWER
+    else:
+        kind = EXACT
+    transposition_table[key] = (value, kind)
+
+
+def min_value(board, alpha=-math.inf, beta=math.inf):
     """
     Returns the min value of the current board
     """
-    if terminal(board):
-        return utility(board)
+    return bits_min_value(*to_bits(board), alpha, beta)
+
+
+def max_value(board, alpha=-math.inf, beta=math.inf):
+    """
+    Returns the max value of the current board
+    """
+    return bits_max_value(*to_bits(board), alpha, beta)
+
+
+def bits_min_value(x, o, alpha, beta):
+    """
+    Returns the min value of the (x, o) board, skipping moves that
+    cannot change the result given that max is already guaranteed
+    alpha and min is already guaranteed beta
+    """
+    last_search["nodes"] += 1
+    if bits_winner(x, o) is not None or x | o == FULL:
+        return bits_utility(x, o)
+    key = canonical(x, o)
+    known, alpha, beta = lookup(key, alpha, beta)
+    if known is not None:
+        return known
+    window = (alpha, beta)
     v = +math.inf
-    for action in actions(board):
-        temp = min(v, max_value(result(board,action)))
-        if temp < v:
-            v = temp
+    for move in bits_moves(x, o):
+        v = min(v, bits_max_value(x, o | 1 << move, alpha, beta))
+        beta = min(beta, v)
+        if alpha >= beta:
+            break
+    store(key, v, *window)
     return v
 
-def max_value(board):
+
+def bits_max_value(x, o, alpha, beta):
     """
-    Returns the max value of the current board
+    Returns the max value of the (x, o) board, skipping moves that
+    cannot change the result given that max is already guaranteed
+    alpha and min is already guaranteed beta
     """
-    if terminal(board):
-        return utility(board)
+    last_search["nodes"] += 1
+    if bits_winner(x, o) is not None or x | o == FULL:
+        return bits_utility(x, o)
+    key = canonical(x, o)
+    known, alpha, beta = lookup(key, alpha, beta)
+    if known is not None:
+        return known
+    window = (alpha, beta)
     v = -math.inf
-    for action in actions(board):
-        temp = max(v, min_value(result(board,action)))
-        if temp > v:
-            v = temp
+    for move in bits_moves(x, o):
+        v = max(v, bits_min_value(x | 1 << move, o, alpha, beta))
+        alpha = max(alpha, v)
+        if alpha >= beta:
+            break
+    store(key, v, *window)
     return v
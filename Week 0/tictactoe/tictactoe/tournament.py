@@ -0,0 +1,212 @@
+"""
+Headless self-play tournament between tic-tac-toe AIs
+
+Usage: python tournament.py [-n games] [-j workers] [player ...]
+"""
+
+import importlib.util
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import tictactoe as ttt
+
+# Players accepted on the command line
+PLAYERS = ["book", "search", "random", "testing"]
+
+# Games per ordered pair of players, and games sent to a worker at once
+GAMES = 250
+CHUNK = 50
+
+# The tictactoe_testing variant of the AI
+TESTING_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    os.pardir, os.pardir, "tictactoe_testing", "tictactoe_testing", "tictactoe.py"
+)
+
+USAGE = f"Usage: python tournament.py [-n games] [-j workers] [{'|'.join(PLAYERS)} ...]"
+
+
+def main():
+    args = sys.argv[1:]
+    games = GAMES
+    workers = None
+    try:
+        while args and args[0] in ["-n", "-j"]:
+            if args[0] == "-n":
+                games = int(args[1])
+            else:
+                workers = int(args[1])
+            args = args[2:]
+    except (IndexError, ValueError):
+        sys.exit(USAGE)
+    names = args or PLAYERS
+    if any(name not in PLAYERS for name in names) or games < 1:
+        sys.exit(USAGE)
+
+    started = time.perf_counter()
+    results = tournament(names, games, workers)
+    seconds = time.perf_counter() - started
+    report(names, results)
+    played = sum(len(records) for records in results.values())
+    print()
+    print(f"{played} games in {seconds:.1f}s")
+
+
+@lru_cache(maxsize=None)
+def load_player(name):
+    """
+    Returns a function taking a board and a random.Random and returning
+    (action, nodes searched) for the named player, nodes being None
+    where the player does not count them.
+
+    book is tictactoe.minimax, which answers from the opening book.
+    search is tictactoe.search with its transposition table cleared
+    before every move, so each move is a full search. random plays any
+    legal move. testing is minimax from tictactoe_testing.
+    """
+    if name == "book":
+        def play(board, rng):
+            return ttt.minimax(board), ttt.last_search["nodes"]
+    elif name == "search":
+        def play(board, rng):
+            ttt.transposition_table.clear()
+            return ttt.search(board), ttt.last_search["nodes"]
+    elif name == "random":
+        def play(board, rng):
+            return rng.choice(sorted(ttt.actions(board))), None
+    elif name == "testing":
+        spec = importlib.util.spec_from_file_location("tictactoe_testing", TESTING_PATH)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+
+        def play(board, rng):
+            return module.minimax([row[:] for row in board]), None
+    else:
+        raise ValueError(f"unknown player {name}")
+    return play
+
+
+def play_games(x_name, o_name, seeds):
+    """
+    Plays one game between x_name as X and o_name as O for each seed,
+    refereed with the rules in tictactoe.py, and returns a record of
+    each: the winner (X, O or None for a tie), the player that forfeited
+    by raising an exception or making an illegal move along with the
+    reason, and the (mark, seconds, nodes) of every move.
+    """
+    records = []
+    for seed in seeds:
+        rng = random.Random(seed)
+        board = ttt.initial_state()
+        record = {"winner": None, "forfeit": None, "error": None, "moves": []}
+        while not ttt.terminal(board):
+            mark = ttt.player(board)
+            play = load_player(x_name if mark == ttt.X else o_name)
+            started = time.perf_counter()
+            try:
+                action, nodes = play(board, rng)
+            except Exception as e:
+                action, nodes = None, None
+                record["error"] = f"{type(e).__name__}: {e}"
+            seconds = time.perf_counter() - started
+            if record["error"] is None and action not in ttt.actions(board):
+                record["error"] = f"illegal move {action}"
+            if record["error"] is not None:
+                record["forfeit"] = mark
+                record["winner"] = ttt.O if mark == ttt.X else ttt.X
+                break
+            record["moves"].append((mark, seconds, nodes))
+            board = ttt.result(board, action)
+        else:
+            record["winner"] = ttt.winner(board)
+        records.append(record)
+    return records
+
+
+def tournament(names, games, workers=None):
+    """
+    Plays games games for every ordered pair of different players
+    across a pool of worker processes, and returns a dict from each
+    (X player, O player) pair to its game records.
+    """
+    results = defaultdict(list)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {}
+        for x_name in names:
+            for o_name in names:
+                if x_name == o_name and len(names) > 1:
+                    continue
+                for start in range(0, games, CHUNK):
+                    seeds = range(start, min(start + CHUNK, games))
+                    future = executor.submit(play_games, x_name, o_name, seeds)
+                    futures[future] = (x_name, o_name)
+        for future, pair in futures.items():
+            results[pair].extend(future.result())
+    return results
+
+
+def percentile(values, p):
+    """Returns the p-th percentile of sorted values, by nearest rank."""
+    if not values:
+        return None
+    rank = max(1, -(-len(values) * p // 100))
+    return values[rank - 1]
+
+
+def report(names, results):
+    """Prints the results of each pairing and then of each player."""
+    print("X player  O player  X wins  ties  O wins  forfeits")
+    for (x_name, o_name), records in results.items():
+        winners = [record["winner"] for record in records]
+        forfeits = sum(record["forfeit"] is not None for record in records)
+        print(f"{x_name:<9} {o_name:<9} {winners.count(ttt.X):>6} "
+              f"{winners.count(None):>5} {winners.count(ttt.O):>7} {forfeits:>9}")
+
+    # Gather every game and move of each player, as either mark
+    outcomes = {name: defaultdict(int) for name in names}
+    latencies = {name: [] for name in names}
+    nodes = {name: [0, 0.0] for name in names}
+    errors = {name: set() for name in names}
+    for (x_name, o_name), records in results.items():
+        for record in records:
+            for name, mark in [(x_name, ttt.X), (o_name, ttt.O)]:
+                if record["winner"] is None:
+                    outcomes[name]["draw"] += 1
+                elif record["winner"] == mark:
+                    outcomes[name]["win"] += 1
+                else:
+                    outcomes[name]["loss"] += 1
+                if record["forfeit"] == mark:
+                    errors[name].add(record["error"])
+            for mark, seconds, count in record["moves"]:
+                name = x_name if mark == ttt.X else o_name
+                latencies[name].append(seconds)
+                if count is not None:
+                    nodes[name][0] += count
+                    nodes[name][1] += seconds
+
+    print()
+    print("player    games   win%  draw%  loss%  nodes/s     p50 ms  p90 ms  p99 ms")
+    for name in names:
+        games = sum(outcomes[name].values())
+        if not games:
+            continue
+        rates = [100 * outcomes[name][outcome] / games for outcome in ["win", "draw", "loss"]]
+        count, seconds = nodes[name]
+        speed = f"{count / seconds:.0f}" if count and seconds else "-"
+        times = sorted(latencies[name])
+        quantiles = [percentile(times, p) for p in [50, 90, 99]]
+        quantiles = [f"{1000 * q:.3f}" if q is not None else "-" for q in quantiles]
+        print(f"{name:<9} {games:>5} {rates[0]:>6.1f} {rates[1]:>6.1f} {rates[2]:>6.1f}  "
+              f"{speed:<10} {quantiles[0]:>7} {quantiles[1]:>7} {quantiles[2]:>7}")
+        for error in sorted(errors[name]):
+            print(f"    forfeited: {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,31 @@
+import functools
 import itertools
+import multiprocessing
+import operator
+import os
+import weakref
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Ways model_check can decide entailment
+BACKENDS = ["enumerate", "dpll", "parallel"]
+
+# Models a worker checks between looks at whether to stop
+CHECK_EVERY = 1 << 12
+
+# Built sentences of each class, by key; see Sentence.intern
+INTERNED = {}
+
+# Event set once any worker of a parallel model_check finds that the
+# query is not entailed, telling the others to stop
+cancelled = None
 
 
 class Sentence():
 
+    # Sentences other than And never change once built, so building an
+    # equal one again returns the same object; see intern
+    __slots__ = ("__weakref__",)
+
     def evaluate(self, model):
         """Evaluates the logical sentence."""
         raise Exception("nothing to evaluate")
@@ -13,7 +36,106 @@ class Sentence():
 
     def symbols(self):
         """Returns a set of all symbols in the logical sentence."""
-        return set()
+        return set(self.frozen_symbols())
+
+    def frozen_symbols(self):
+        """
+        Returns a frozenset of all symbols in the logical sentence,
+        cached where the sentence cannot change; symbols copies it.
+        """
+        return frozenset()
+
+    def code(self, index):
+        """
+        Returns a Python expression that is truthy exactly when the
+        sentence is true in the model m, an integer whose bit index[name]
+        holds the value of each symbol.
+        """
+        raise Exception("nothing to compile")
+
+    def compile(self, symbols):
+        """
+        Returns a function that evaluates the sentence on an integer
+        model, in which bit i holds the value of the i-th of symbols.
+        Much faster than evaluate, as it runs one generated expression
+        instead of walking the sentence and looking up each symbol.
+        """
+        index = {name: i for i, name in enumerate(symbols)}
+        try:
+            return eval(f"lambda m: {self.code(index)}")
+        except (SyntaxError, MemoryError, RecursionError):
+            # Too deeply nested for the parser: build closures instead
+            return self.closure(index)
+
+    def closure(self, index):
+        """
+        Returns a function that evaluates the sentence on an integer
+        model as the code expression does, built from the functions
+        of its parts rather than from source, so it works however
+        deeply the sentence is nested.
+        """
+        raise Exception("nothing to compile")
+
+    def tseitin(self, cnf):
+        """
+        Adds clauses to cnf defining a literal equivalent to the
+        sentence in terms of the literals of its parts, and returns it.
+        """
+        raise Exception("nothing to encode")
+
+    def to_cnf(self, cnf=None):
+        """
+        Returns a CNF, or adds to cnf if given, that is satisfiable
+        exactly when the sentence is. The Tseitin encoding gives each
+        compound part its own variable, so the clauses grow linearly
+        with the sentence rather than exponentially.
+        """
+        if cnf is None:
+            cnf = CNF()
+        cnf.add(cnf.encode(self))
+        return cnf
+
+    def simplified(self, model):
+        """
+        Returns an equivalent sentence given the values of the symbols
+        in model, a partial assignment, or True or False if that
+        settles it.
+        """
+        raise Exception("nothing to simplify")
+
+    def simplify(self, model=None):
+        """
+        Returns a smaller sentence equivalent to this one wherever the
+        symbols in model (if given) have their values there: nested
+        conjunctions and disjunctions are flattened, repeated parts and
+        parts absorbed by others are dropped, and known values are
+        folded in. A result known to be true is And(), and one known to
+        be false is Or().
+        """
+        result = self.simplified(model or {})
+        if result is True:
+            return And()
+        if result is False:
+            return Or()
+        return result
+
+    @staticmethod
+    def intern(cls, key):
+        """
+        Returns (sentence, False) with the sentence of class cls already
+        built from key, or (sentence, True) with a new, empty one that
+        the caller fills in. Keys are built from the ids of the parts,
+        which are themselves interned, so structurally equal sentences
+        share one object; mutable conjunctions never count as equal
+        parts. Sentences no longer used elsewhere are dropped.
+        """
+        table = INTERNED.setdefault(cls, weakref.WeakValueDictionary())
+        sentence = table.get(key)
+        if sentence is not None:
+            return sentence, False
+        sentence = object.__new__(cls)
+        table[key] = sentence
+        return sentence, True
 
     @classmethod
     def validate(cls, sentence):
@@ -43,15 +165,24 @@ class Sentence():
 
 
 class Symbol(Sentence):
+    __slots__ = ("name", "cached_hash", "cached_symbols")
 
-    def __init__(self, name):
-        self.name = name
+    def __new__(cls, name):
+        self, new = Sentence.intern(cls, name)
+        if new:
+            self.name = name
+            self.cached_hash = hash(("symbol", name))
+            self.cached_symbols = frozenset([name])
+        return self
+
+    def __reduce__(self):
+        return (Symbol, (self.name,))
 
     def __eq__(self, other):
         return isinstance(other, Symbol) and self.name == other.name
 
     def __hash__(self):
-        return hash(("symbol", self.name))
+        return self.cached_hash
 
     def __repr__(self):
         return self.name
@@ -65,19 +196,54 @@ class Symbol(Sentence):
     def formula(self):
         return self.name
 
-    def symbols(self):
-        return {self.name}
+    def frozen_symbols(self):
+        return self.cached_symbols
+
+    def code(self, index):
+        try:
+            return f"m & {1 << index[self.name]}"
+        except KeyError:
+            raise Exception(f"variable {self.name} not in model")
+
+    def closure(self, index):
+        try:
+            bit = 1 << index[self.name]
+        except KeyError:
+            raise Exception(f"variable {self.name} not in model")
+        return lambda m: m & bit
+
+    def tseitin(self, cnf):
+        return cnf.variable(self.name)
+
+    def simplified(self, model):
+        if self.name in model:
+            return bool(model[self.name])
+        return self
 
 
 class Not(Sentence):
-    def __init__(self, operand):
+    __slots__ = ("operand", "cached_hash")
+
+    def __new__(cls, operand):
         Sentence.validate(operand)
-        self.operand = operand
+        self, new = Sentence.intern(cls, id(operand))
+        if new:
+            self.operand = operand
+            self.cached_hash = self.compute_hash() if frozen([operand]) else None
+        return self
+
+    def __reduce__(self):
+        return (Not, (self.operand,))
 
     def __eq__(self, other):
         return isinstance(other, Not) and self.operand == other.operand
 
     def __hash__(self):
+        if self.cached_hash is None:
+            return self.compute_hash()
+        return self.cached_hash
+
+    def compute_hash(self):
         return hash(("not", hash(self.operand)))
 
     def __repr__(self):
@@ -89,23 +255,53 @@ class Not(Sentence):
     def formula(self):
         return "¬" + Sentence.parenthesize(self.operand.formula())
 
-    def symbols(self):
-        return self.operand.symbols()
+    def frozen_symbols(self):
+        return self.operand.frozen_symbols()
+
+    def code(self, index):
+        return f"not ({self.operand.code(index)})"
+
+    def closure(self, index):
+        operand = self.operand.closure(index)
+        return lambda m: not operand(m)
+
+    def tseitin(self, cnf):
+        return -cnf.encode(self.operand)
+
+    def simplified(self, model):
+        return negation(self.operand.simplified(model))
 
 
 class And(Sentence):
+    """
+    Unlike the other sentences, a conjunction can grow with add, so it
+    is never shared: its hash and symbols are cached until the next
+    add, and only while none of its conjuncts can change either.
+    """
+    __slots__ = ("conjuncts", "cached_hash", "cached_symbols")
+
     def __init__(self, *conjuncts):
         for conjunct in conjuncts:
             Sentence.validate(conjunct)
         self.conjuncts = list(conjuncts)
+        self.cached_hash = None
+        self.cached_symbols = None
+
+    def __reduce__(self):
+        return (self.__class__, tuple(self.conjuncts))
 
     def __eq__(self, other):
         return isinstance(other, And) and self.conjuncts == other.conjuncts
 
     def __hash__(self):
-        return hash(
-            ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
-        )
+        if self.cached_hash is None:
+            value = hash(
+                ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
+            )
+            if not frozen(self.conjuncts):
+                return value
+            self.cached_hash = value
+        return self.cached_hash
 
     def __repr__(self):
         conjunctions = ", ".join(
@@ -116,6 +312,8 @@ class And(Sentence):
     def add(self, conjunct):
         Sentence.validate(conjunct)
         self.conjuncts.append(conjunct)
+        self.cached_hash = None
+        self.cached_symbols = None
 
     def evaluate(self, model):
         return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
@@ -126,24 +324,95 @@ class And(Sentence):
         return " ∧ ".join([Sentence.parenthesize(conjunct.formula())
                            for conjunct in self.conjuncts])
 
-    def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
+    def frozen_symbols(self):
+        if self.cached_symbols is None:
+            symbols = frozenset().union(
+                *[conjunct.frozen_symbols() for conjunct in self.conjuncts]
+            )
+            if not frozen(self.conjuncts):
+                return symbols
+            self.cached_symbols = symbols
+        return self.cached_symbols
+
+    def code(self, index):
+        if not self.conjuncts:
+            return "True"
+        return " and ".join(f"({conjunct.code(index)})" for conjunct in self.conjuncts)
+
+    def closure(self, index):
+        conjuncts = [conjunct.closure(index) for conjunct in self.conjuncts]
+        return lambda m: all(conjunct(m) for conjunct in conjuncts)
+
+    def tseitin(self, cnf):
+        v = cnf.fresh()
+        literals = [cnf.encode(conjunct) for conjunct in self.conjuncts]
+        for literal in literals:
+            cnf.add(-v, literal)
+        cnf.add(v, *[-literal for literal in literals])
+        return v
+
+    def simplified(self, model):
+        parts = flatten(And, self.conjuncts, model)
+
+        # Literals among the conjuncts hold wherever the conjunction
+        # does, so fold them into the other conjuncts, again for as
+        # long as that turns up new literals
+        while parts is not False:
+            literals = [part for part in parts if literal_value(part) is not None]
+            known = dict(model)
+            known.update(literal_value(literal) for literal in literals)
+            if len(known) == len(model):
+                break
+            model = known
+            rest = flatten(And, [part for part in parts if literal_value(part) is None], model)
+            parts = rest if rest is False else literals + rest
+        if parts is False:
+            return False
+
+        # a ∧ (a ∨ b) is just a
+        parts = absorb(Or, parts)
+        if not parts:
+            return True
+        if len(parts) == 1:
+            return parts[0]
+        return And(*parts)
 
 
 class Or(Sentence):
-    def __init__(self, *disjuncts):
+    __slots__ = ("disjuncts", "cached_hash", "cached_symbols")
+
+    def __new__(cls, *disjuncts):
         for disjunct in disjuncts:
             Sentence.validate(disjunct)
-        self.disjuncts = list(disjuncts)
+        self, new = Sentence.intern(cls, tuple(id(disjunct) for disjunct in disjuncts))
+        if new:
+            self.disjuncts = disjuncts
+            self.cached_hash = None
+            self.cached_symbols = None
+            if frozen(disjuncts):
+                self.cached_hash = self.compute_hash()
+                self.cached_symbols = self.compute_symbols()
+        return self
+
+    def __reduce__(self):
+        return (Or, self.disjuncts)
 
     def __eq__(self, other):
         return isinstance(other, Or) and self.disjuncts == other.disjuncts
 
     def __hash__(self):
+        if self.cached_hash is None:
+            return self.compute_hash()
+        return self.cached_hash
+
+    def compute_hash(self):
         return hash(
             ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
         )
 
+    def compute_symbols(self):
+        return frozenset().union(*[disjunct.frozen_symbols() for disjunct in self.disjuncts])
+
     def __repr__(self):
         disjuncts = ", ".join([str(disjunct) for disjunct in self.disjuncts])
         return f"Or({disjuncts})"
@@ -157,16 +426,61 @@ class Or(Sentence):
         return " ∨  ".join([Sentence.parenthesize(disjunct.formula())
                             for disjunct in self.disjuncts])
 
-    def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
+    def frozen_symbols(self):
+        if self.cached_symbols is None:
+            return self.compute_symbols()
+        return self.cached_symbols
+
+    def code(self, index):
+        if not self.disjuncts:
+            return "False"
+        return " or ".join(f"({disjunct.code(index)})" for disjunct in self.disjuncts)
+
+    def closure(self, index):
+        disjuncts = [disjunct.closure(index) for disjunct in self.disjuncts]
+        return lambda m: any(disjunct(m) for disjunct in disjuncts)
+
+    def tseitin(self, cnf):
+        v = cnf.fresh()
+        literals = [cnf.encode(disjunct) for disjunct in self.disjuncts]
+        for literal in literals:
+            cnf.add(v, -literal)
+        cnf.add(-v, *literals)
+        return v
+
+    def simplified(self, model):
+        parts = flatten(Or, self.disjuncts, model)
+        if parts is True:
+            return True
+
+        # a ∨ (a ∧ b) is just a
+        parts = absorb(And, parts)
+        if not parts:
+            return False
+        if len(parts) == 1:
+            return parts[0]
+        return Or(*parts)
 
 
 class Implication(Sentence):
-    def __init__(self, antecedent, consequent):
+    __slots__ = ("antecedent", "consequent", "cached_hash", "cached_symbols")
+
+    def __new__(cls, antecedent, consequent):
         Sentence.validate(antecedent)
         Sentence.validate(consequent)
-        self.antecedent = antecedent
-        self.consequent = consequent
+        self, new = Sentence.intern(cls, (id(antecedent), id(consequent)))
+        if new:
+            self.antecedent = antecedent
+            self.consequent = consequent
+            self.cached_hash = None
+            self.cached_symbols = None
+            if frozen([antecedent, consequent]):
+                self.cached_hash = self.compute_hash()
+                self.cached_symbols = self.compute_symbols()
+        return self
+
+    def __reduce__(self):
+        return (Implication, (self.antecedent, self.consequent))
 
     def __eq__(self, other):
         return (isinstance(other, Implication)
@@ -174,8 +488,16 @@ class Implication(Sentence):
                 and self.consequent == other.consequent)
 
     def __hash__(self):
+        if self.cached_hash is None:
+            return self.compute_hash()
+        return self.cached_hash
+
+    def compute_hash(self):
         return hash(("implies", hash(self.antecedent), hash(self.consequent)))
 
+    def compute_symbols(self):
+        return self.antecedent.frozen_symbols() | self.consequent.frozen_symbols()
+
     def __repr__(self):
         return f"Implication({self.antecedent}, {self.consequent})"
 
@@ -188,16 +510,60 @@ class Implication(Sentence):
         consequent = Sentence.parenthesize(self.consequent.formula())
         return f"{antecedent} => {consequent}"
 
-    def symbols(self):
-        return set.union(self.antecedent.symbols(), self.consequent.symbols())
+    def frozen_symbols(self):
+        if self.cached_symbols is None:
+            return self.compute_symbols()
+        return self.cached_symbols
+
+    def code(self, index):
+        return (f"not ({self.antecedent.code(index)})"
+                f" or ({self.consequent.code(index)})")
+
+    def closure(self, index):
+        antecedent = self.antecedent.closure(index)
+        consequent = self.consequent.closure(index)
+        return lambda m: not antecedent(m) or consequent(m)
+
+    def tseitin(self, cnf):
+        v = cnf.fresh()
+        a = cnf.encode(self.antecedent)
+        b = cnf.encode(self.consequent)
+        cnf.add(-v, -a, b)
+        cnf.add(v, a)
+        cnf.add(v, -b)
+        return v
+
+    def simplified(self, model):
+        antecedent = self.antecedent.simplified(model)
+        consequent = self.consequent.simplified(model)
+        if antecedent is False or consequent is True or antecedent == consequent:
+            return True
+        if antecedent is True:
+            return consequent
+        if consequent is False:
+            return negation(antecedent)
+        return Implication(antecedent, consequent)
 
 
 class Biconditional(Sentence):
-    def __init__(self, left, right):
+    __slots__ = ("left", "right", "cached_hash", "cached_symbols")
+
+    def __new__(cls, left, right):
         Sentence.validate(left)
         Sentence.validate(right)
-        self.left = left
-        self.right = right
+        self, new = Sentence.intern(cls, (id(left), id(right)))
+        if new:
+            self.left = left
+            self.right = right
+            self.cached_hash = None
+            self.cached_symbols = None
+            if frozen([left, right]):
+                self.cached_hash = self.compute_hash()
+                self.cached_symbols = self.compute_symbols()
+        return self
+
+    def __reduce__(self):
+        return (Biconditional, (self.left, self.right))
 
     def __eq__(self, other):
         return (isinstance(other, Biconditional)
@@ -205,8 +571,16 @@ class Biconditional(Sentence):
                 and self.right == other.right)
 
     def __hash__(self):
+        if self.cached_hash is None:
+            return self.compute_hash()
+        return self.cached_hash
+
+    def compute_hash(self):
         return hash(("biconditional", hash(self.left), hash(self.right)))
 
+    def compute_symbols(self):
+        return self.left.frozen_symbols() | self.right.frozen_symbols()
+
     def __repr__(self):
         return f"Biconditional({self.left}, {self.right})"
 
@@ -221,43 +595,480 @@ class Biconditional(Sentence):
         right = Sentence.parenthesize(str(self.right))
         return f"{left} <=> {right}"
 
-    def symbols(self):
-        return set.union(self.left.symbols(), self.right.symbols())
-
-
-def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
-
-    def check_all(knowledge, query, symbols, model):
-        """Checks if knowledge base entails query, given a particular model."""
-
-        # If model has an assignment for each symbol
-        if not symbols:
-
-            # If knowledge base is true in model, then query must also be true
-            if knowledge.evaluate(model):
-                return query.evaluate(model)
+    def frozen_symbols(self):
+        if self.cached_symbols is None:
+            return self.compute_symbols()
+        return self.cached_symbols
+
+    def code(self, index):
+        return f"(not ({self.left.code(index)})) == (not ({self.right.code(index)}))"
+
+    def closure(self, index):
+        left = self.left.closure(index)
+        right = self.right.closure(index)
+        return lambda m: (not left(m)) == (not right(m))
+
+    def tseitin(self, cnf):
+        v = cnf.fresh()
+        a = cnf.encode(self.left)
+        b = cnf.encode(self.right)
+        cnf.add(-v, -a, b)
+        cnf.add(-v, a, -b)
+        cnf.add(v, a, b)
+        cnf.add(v, -a, -b)
+        return v
+
+    def simplified(self, model):
+        left = self.left.simplified(model)
+        right = self.right.simplified(model)
+        if left == right:
             return True
+        if isinstance(right, bool):
+            left, right = right, left
+        if left is True:
+            return right
+        if left is False:
+            return negation(right)
+        if left == negation(right):
+            return False
+        return Biconditional(left, right)
+
+
+def frozen(parts):
+    """
+    Returns True if none of parts can change: none is an And or holds
+    one, which is what leaves a sentence without a cached hash. Only
+    sentences built from such parts cache their hash and symbols.
+    """
+    return all(
+        not isinstance(part, And) and getattr(part, "cached_hash", None) is not None
+        for part in parts
+    )
+
+
+def negation(sentence):
+    """
+    Returns the negation of a simplified sentence, or of True or False,
+    without stacking two Nots.
+    """
+    if isinstance(sentence, bool):
+        return not sentence
+    if isinstance(sentence, Not):
+        return sentence.operand
+    return Not(sentence)
+
+
+def literal_value(sentence):
+    """
+    Returns (name, value) if sentence is a symbol or a negated symbol,
+    else None.
+    """
+    if isinstance(sentence, Symbol):
+        return sentence.name, True
+    if isinstance(sentence, Not) and isinstance(sentence.operand, Symbol):
+        return sentence.operand.name, False
+    return None
+
+
+def flatten(cls, parts, model):
+    """
+    Simplifies parts, the conjuncts of an And or disjuncts of an Or
+    (cls), given model, and returns them with nested sentences of the
+    same kind merged in and repeats dropped. Returns False for an And,
+    or True for an Or, if some part alone settles the result.
+    """
+    identity = cls is And
+    flat = {}
+    for part in parts:
+        part = part.simplified(model)
+        if part is identity:
+            continue
+        if part is (not identity):
+            return not identity
+        if isinstance(part, cls):
+            for nested in part.conjuncts if cls is And else part.disjuncts:
+                flat[nested] = None
         else:
-
-            # Choose one of the remaining unused symbols
-            remaining = symbols.copy()
-            p = remaining.pop()
-
-            # Create a model where the symbol is true
-            model_true = model.copy()
-            model_true[p] = True
-
-            # Create a model where the symbol is false
-            model_false = model.copy()
-            model_false[p] = False
-
-            # Ensure entailment holds in both models
-            return (check_all(knowledge, query, remaining, model_true) and
-                    check_all(knowledge, query, remaining, model_false))
+            flat[part] = None
+
+    # A part next to its own negation settles the result too
+    for part in flat:
+        if negation(part) in flat:
+            return not identity
+    return list(flat)
+
+
+def absorb(cls, parts):
+    """
+    Drops each part that is a cls (the dual of the sentence holding
+    parts) with another of parts among its own parts.
+    """
+    kept = set(parts)
+    result = []
+    for part in parts:
+        if isinstance(part, cls):
+            nested = part.conjuncts if cls is And else part.disjuncts
+            if any(other in kept for other in nested if other is not part):
+                kept.discard(part)
+                continue
+        result.append(part)
+    return result
+
+
+class CNF():
+    """
+    A formula in conjunctive normal form: a list of clauses, each a
+    list of literals. As in the DIMACS format, variable v appears as
+    the literal v where it must be true and -v where it must be false.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.clauses = []
+
+        # Variables of symbol names, and literals of encoded sentences
+        self.variables = {}
+        self.literals = {}
+
+    def fresh(self):
+        """Returns a new variable."""
+        self.count += 1
+        return self.count
+
+    def variable(self, name):
+        """Returns the variable of a symbol name."""
+        if name not in self.variables:
+            self.variables[name] = self.fresh()
+        return self.variables[name]
+
+    def encode(self, sentence):
+        """
+        Returns the literal of a sentence, encoding it the first time,
+        so parts that occur many times share one variable.
+        """
+        if sentence not in self.literals:
+            self.literals[sentence] = sentence.tseitin(self)
+        return self.literals[sentence]
+
+    def add(self, *literals):
+        """Adds a clause that one of literals must satisfy."""
+        self.clauses.append(list(literals))
+
+    def satisfiable(self):
+        """
+        Returns a model satisfying every clause, as a dict from symbol
+        names to truth values, or None if there is none.
+        """
+        values = dpll(self.clauses, self.count)
+        if values is None:
+            return None
+        return {name: values[v] for name, v in self.variables.items()}
+
+
+def dpll(clauses, count):
+    """
+    Returns a list of truth values for variables 1 to count (at their
+    index) satisfying all clauses, or None if they are unsatisfiable.
+
+    DPLL search: assign a variable, propagate every clause left with a
+    single unassigned literal, and on a conflict undo the assignments
+    back to the latest decision not yet tried both ways and flip it.
+    Each clause watches two of its literals and is only looked at when
+    one of them becomes false, so propagation skips most clauses.
+    """
+    # 1 for true, -1 for false, 0 while unassigned
+    assigned = [0] * (count + 1)
+
+    def value(literal):
+        return assigned[literal] if literal > 0 else -assigned[-literal]
+
+    # Clauses watching each literal, as their first or second element
+    watches = {literal: [] for v in range(1, count + 1) for literal in (v, -v)}
+    units = []
+    occurrences = [0] * (count + 1)
+    for clause in clauses:
+        clause = list(dict.fromkeys(clause))
+        if any(-literal in clause for literal in clause):
+            continue
+        if not clause:
+            return None
+        for literal in clause:
+            occurrences[abs(literal)] += 1
+        if len(clause) == 1:
+            units.append(clause[0])
+        else:
+            watches[clause[0]].append(clause)
+            watches[clause[1]].append(clause)
+
+    # Assignments in order, and the next one to propagate
+    trail = []
+    head = 0
+
+    def assign(literal):
+        assigned[abs(literal)] = 1 if literal > 0 else -1
+        trail.append(literal)
+
+    def propagate():
+        """Propagates the trail from head, returning False on a conflict."""
+        nonlocal head
+        while head < len(trail):
+            false = -trail[head]
+            head += 1
+            watching = watches[false]
+            kept = []
+            for i, clause in enumerate(watching):
+                # Keep the literal that just became false second
+                if clause[0] == false:
+                    clause[0], clause[1] = clause[1], clause[0]
+                other = clause[0]
+                if value(other) == 1:
+                    kept.append(clause)
+                    continue
+
+                # Watch another literal that is not false, if any
+                for k in range(2, len(clause)):
+                    if value(clause[k]) != -1:
+                        clause[1], clause[k] = clause[k], clause[1]
+                        watches[clause[1]].append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if value(other) == -1:
+                        kept.extend(watching[i + 1:])
+                        watches[false] = kept
+                        return False
+                    assign(other)
+            watches[false] = kept
+        return True
+
+    for literal in units:
+        if value(literal) == -1:
+            return None
+        if value(literal) == 0:
+            assign(literal)
+
+    # Try the variables in most clauses first
+    order = sorted(range(1, count + 1), key=lambda v: -occurrences[v])
+
+    # (trail length before the decision, decided literal, whether it
+    # is the second value tried)
+    decisions = []
+    while True:
+        if not propagate():
+            while decisions:
+                start, literal, flipped = decisions.pop()
+                for undone in trail[start:]:
+                    assigned[abs(undone)] = 0
+                del trail[start:]
+                head = start
+                if not flipped:
+                    decisions.append((start, -literal, True))
+                    assign(-literal)
+                    break
+            else:
+                return None
+            continue
+
+        v = next((v for v in order if not assigned[v]), None)
+        if v is None:
+            return [assigned[v] == 1 for v in range(count + 1)]
+        decisions.append((len(trail), -v, False))
+        assign(-v)
+
+
+def model_check(knowledge, query, backend="enumerate", workers=None):
+    """
+    Checks if knowledge base entails query.
+
+    The enumerate backend tries every model of the symbols, and the
+    parallel backend does the same, split across workers processes (by
+    default one per CPU). Both skip the models that contradict values
+    the simplified knowledge base fixes. The dpll backend instead looks
+    for a model of knowledge and not query with a SAT solver, which
+    handles far more symbols; entailment holds exactly when there is
+    none.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"unknown backend {backend}")
 
     # Get all symbols in both knowledge and query
-    symbols = set.union(knowledge.symbols(), query.symbols())
+    symbols = knowledge.frozen_symbols() | query.frozen_symbols()
+
+    # Simplifying once is cheap next to evaluating in every model
+    knowledge = knowledge.simplify()
+    if isinstance(knowledge, Or) and not knowledge.disjuncts:
+        return True
+
+    if backend == "dpll":
+        cnf = knowledge.to_cnf()
+        Not(query).to_cnf(cnf)
+        return cnf.satisfiable() is None
+
+    # Symbols that knowledge fixes go last, so the only models where it
+    # can be true are one range: the free symbols take every value and
+    # the fixed ones just their own
+    fixed = fixed_values(knowledge)
+    free = sorted(symbols - fixed.keys())
+    symbols = free + sorted(fixed)
+    start = sum(
+        1 << i for i, name in enumerate(symbols) if fixed.get(name, False)
+    )
+    stop = start + (1 << len(free))
+
+    if backend == "parallel":
+        return check_parallel(knowledge, query, symbols, start, stop, workers)
+    return check_models(knowledge, query, symbols, start, stop)
+
+
+def fixed_values(knowledge):
+    """
+    Returns a dict from the symbols that knowledge, a simplified
+    sentence, sets to a value in every model where it is true, as a
+    literal or a literal conjunct, to those values.
+    """
+    parts = knowledge.conjuncts if isinstance(knowledge, And) else [knowledge]
+    return dict(
+        literal_value(part) for part in parts if literal_value(part) is not None
+    )
+
+
+def check_models(knowledge, query, symbols, start, stop):
+    """
+    Checks if query is true in every model from start up to stop where
+    knowledge is true. Each integer below 2^n is one model, bit i
+    holding the value of the i-th symbol. Returns None if stopped early
+    because cancelled was set.
+    """
+    # Compile both sentences to evaluate them on integer models
+    knowledge_true = knowledge.compile(symbols)
+    query_true = query.compile(symbols)
+
+    for block in range(start, stop, CHECK_EVERY):
+        if cancelled is not None and cancelled.is_set():
+            return None
+
+        # If knowledge base is true in model, then query must also be true
+        for model in range(block, min(block + CHECK_EVERY, stop)):
+            if knowledge_true(model) and not query_true(model):
+                return False
+    return True
+
+
+def start_worker(event):
+    """Sets up a worker process of check_parallel."""
+    global cancelled
+    cancelled = event
+
+
+def check_parallel(knowledge, query, symbols, start, stop, workers=None):
+    """
+    Checks if query is true in every model from start up to stop, a
+    power of two apart, where knowledge is true, by fixing the last
+    few symbols that vary in that range to each of their assignments
+    and checking the models of each on a pool of worker processes. As
+    soon as one finds a model where query is false, the rest are
+    cancelled.
+    """
+    workers = workers or os.cpu_count() or 1
+    free = (stop - start).bit_length() - 1
+
+    # Split into about four parts per worker, so that they all stay busy
+    split = min(free, (4 * workers - 1).bit_length())
+    size = 1 << (free - split)
+
+    event = multiprocessing.Event()
+    with ProcessPoolExecutor(max_workers=workers, initializer=start_worker,
+                             initargs=(event,)) as executor:
+        futures = [
+            executor.submit(check_models, knowledge, query, symbols,
+                            start + part * size, start + (part + 1) * size)
+            for part in range(1 << split)
+        ]
+        for future in as_completed(futures):
+            if future.result() is False:
+                event.set()
+                for pending in futures:
+                    pending.cancel()
+                return False
+    return True
+
+
+class KnowledgeBase(And):
+    """
+    A conjunction that finds its models once and answers many queries
+    from them. Adding a conjunct updates the models in place rather
+    than starting over: it only filters them, after extending them to
+    any symbols the conjunct brings in.
+    """
 
-    # Check that knowledge entails query
-    return check_all(knowledge, query, symbols, dict())
+    def __init__(self, *conjuncts):
+        super().__init__(*conjuncts)
+        self.names = None
+        self.cached_models = None
+        self.always = None
+        self.sometimes = None
+
+    def add(self, conjunct):
+        super().add(conjunct)
+        if self.cached_models is None:
+            return
+
+        # Extend every model with each assignment of the new symbols
+        new = sorted(conjunct.frozen_symbols() - set(self.names))
+        if new:
+            shift = len(self.names)
+            self.names.extend(new)
+            self.cached_models = [
+                model | extension << shift
+                for model in self.cached_models
+                for extension in range(1 << len(new))
+            ]
+
+        conjunct_true = conjunct.compile(self.names)
+        self.cached_models = [model for model in self.cached_models if conjunct_true(model)]
+        self.always = None
+        self.sometimes = None
+
+    def models(self):
+        """
+        Returns the models of the knowledge base as integers, in which
+        bit i holds the value of symbol self.names[i].
+        """
+        if self.cached_models is None:
+            self.names = sorted(self.frozen_symbols())
+            knowledge_true = self.compile(self.names)
+            self.cached_models = [
+                model for model in range(1 << len(self.names)) if knowledge_true(model)
+            ]
+        return self.cached_models
+
+    def satisfied(self, query):
+        """
+        Yields whether query is true in each model, extended with each
+        assignment of any symbols of query not in the knowledge base.
+        """
+        models = self.models()
+        new = sorted(query.frozen_symbols() - set(self.names))
+        query_true = query.compile(self.names + new)
+        shift = len(self.names)
+        for model in models:
+            for extension in range(1 << len(new)):
+                yield query_true(model | extension << shift)
+
+    def entails(self, query):
+        """Returns True if query is true in every model."""
+        models = self.models()
+        if isinstance(query, Symbol) and query.name in self.names:
+            if self.always is None:
+                self.always = functools.reduce(operator.and_, models, -1)
+            return bool(self.always >> self.names.index(query.name) & 1)
+        return all(self.satisfied(query))
+
+    def possible(self, query):
+        """Returns True if query is true in some model."""
+        models = self.models()
+        if isinstance(query, Symbol) and query.name in self.names:
+            if self.sometimes is None:
+                self.sometimes = functools.reduce(operator.or_, models, 0)
+            return bool(self.sometimes >> self.names.index(query.name) & 1)
+        return any(self.satisfied(query))
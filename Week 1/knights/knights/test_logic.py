@@ -0,0 +1,144 @@
+import random
+import unittest
+
+from logic import *
+
+
+def random_sentence(rng, names, depth):
+    """Returns a random sentence over the symbols in names."""
+    if depth == 0 or rng.random() < 0.25:
+        return Symbol(rng.choice(names))
+    kind = rng.choice(["not", "and", "or", "implication", "biconditional"])
+    if kind == "not":
+        return Not(random_sentence(rng, names, depth - 1))
+    if kind == "and":
+        return And(*[random_sentence(rng, names, depth - 1)
+                     for _ in range(rng.randint(1, 3))])
+    if kind == "or":
+        return Or(*[random_sentence(rng, names, depth - 1)
+                    for _ in range(rng.randint(1, 3))])
+    if kind == "implication":
+        return Implication(random_sentence(rng, names, depth - 1),
+                           random_sentence(rng, names, depth - 1))
+    return Biconditional(random_sentence(rng, names, depth - 1),
+                         random_sentence(rng, names, depth - 1))
+
+
+def entails(knowledge, query):
+    """
+    Checks entailment by recursively enumerating models and calling
+    evaluate, as model_check originally did.
+    """
+    def check_all(symbols, model):
+        if not symbols:
+            return not knowledge.evaluate(model) or query.evaluate(model)
+        remaining = symbols.copy()
+        p = remaining.pop()
+        return (check_all(remaining, {**model, p: True})
+                and check_all(remaining, {**model, p: False}))
+
+    return check_all(knowledge.symbols() | query.symbols(), dict())
+
+
+class TestMutableConjunctions(unittest.TestCase):
+
+    def test_parent_sees_conjunct_added_later(self):
+        a, b, c = Symbol("A"), Symbol("B"), Symbol("C")
+        inner = And(a)
+        implication = Implication(inner, b)
+        inner.add(c)
+        self.assertEqual(implication.symbols(), {"A", "B", "C"})
+        self.assertEqual(Not(inner).symbols(), {"A", "C"})
+        self.assertEqual(hash(implication), hash(Implication(And(a, c), b)))
+        for backend in BACKENDS:
+            self.assertFalse(
+                model_check(And(implication, Not(b)), Not(a), backend=backend)
+            )
+
+    def test_nested_conjunction_sees_conjunct_added_later(self):
+        inner = And(Symbol("A"))
+        outer = And(inner)
+        self.assertEqual(outer.symbols(), {"A"})
+        inner.add(Symbol("B"))
+        self.assertEqual(outer.symbols(), {"A", "B"})
+
+    def test_symbols_returns_a_new_set(self):
+        knowledge = KnowledgeBase(Symbol("A"), Or(Symbol("B"), Symbol("C")))
+        query = Implication(Symbol("A"), Symbol("D"))
+        symbols = set.union(knowledge.symbols(), query.symbols())
+        self.assertEqual(symbols, {"A", "B", "C", "D"})
+        symbols = query.symbols()
+        symbols.add("E")
+        self.assertEqual(query.symbols(), {"A", "D"})
+        self.assertIsInstance(Symbol("A").symbols(), set)
+
+
+class TestCompile(unittest.TestCase):
+
+    def test_deeply_nested_sentence(self):
+        sentence = Symbol("A")
+        for i in range(210):
+            sentence = Implication(Symbol(f"P{i % 3}"), sentence)
+        self.assertTrue(model_check(And(Symbol("A")), sentence))
+        self.assertTrue(model_check(And(Symbol("A")), sentence, backend="parallel"))
+
+    def test_closure_matches_code(self):
+        a, b, c = Symbol("A"), Symbol("B"), Symbol("C")
+        sentence = And(Or(a, Not(b)), Implication(b, c), Biconditional(a, Not(c)))
+        symbols = ["A", "B", "C"]
+        index = {name: i for i, name in enumerate(symbols)}
+        compiled = sentence.compile(symbols)
+        closure = sentence.closure(index)
+        for model in range(8):
+            self.assertEqual(bool(compiled(model)), bool(closure(model)))
+
+
+class TestBackends(unittest.TestCase):
+
+    def assert_backends_agree(self, knowledge, query):
+        expected = entails(knowledge, query)
+        for backend in ["enumerate", "dpll"]:
+            with self.subTest(knowledge=knowledge, query=query, backend=backend):
+                self.assertEqual(model_check(knowledge, query, backend=backend), expected)
+
+    def test_random_sentences(self):
+        rng = random.Random(0)
+        for _ in range(300):
+            knowledge = And(*[random_sentence(rng, ["A", "B", "C", "D"], 3)
+                              for _ in range(rng.randint(1, 3))])
+            # The query may mention symbols the knowledge base does not
+            query = random_sentence(rng, ["A", "B", "C", "E", "F"], 2)
+            self.assert_backends_agree(knowledge, query)
+
+    def test_unsatisfiable_knowledge(self):
+        rng = random.Random(1)
+        for _ in range(50):
+            sentence = random_sentence(rng, ["A", "B", "C"], 3)
+            knowledge = And(sentence, Not(sentence))
+            query = random_sentence(rng, ["A", "D"], 2)
+            self.assertTrue(entails(knowledge, query))
+            self.assert_backends_agree(knowledge, query)
+
+
+class TestSimplify(unittest.TestCase):
+
+    def test_random_sentences(self):
+        rng = random.Random(2)
+        names = ["A", "B", "C", "D"]
+        models = [
+            {name: bool(bits >> i & 1) for i, name in enumerate(names)}
+            for bits in range(1 << len(names))
+        ]
+        for _ in range(300):
+            sentence = random_sentence(rng, names, 4)
+            known = {name: rng.random() < 0.5 for name in rng.sample(names, rng.randint(0, 2))}
+            simplified = sentence.simplify(known)
+            for model in models:
+                if any(model[name] != value for name, value in known.items()):
+                    continue
+                with self.subTest(sentence=sentence, known=known, model=model):
+                    self.assertEqual(simplified.evaluate(model), sentence.evaluate(model))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -22,14 +22,14 @@ symbols = characters + rooms + weapons
 
 def check_knowledge(knowledge):
     for symbol in symbols:
-        if model_check(knowledge, symbol):
+        if knowledge.entails(symbol):
             termcolor.cprint(f"{symbol}: YES", "green")
-        elif not model_check(knowledge, Not(symbol)):
+        elif knowledge.possible(symbol):
             print(f"{symbol}: MAYBE")
 
 
 # There must be a person, room, and weapon.
-knowledge = And(
+knowledge = KnowledgeBase(
     Or(mustard, plum, scarlet),
     Or(ballroom, kitchen, library),
     Or(knife, revolver, wrench)